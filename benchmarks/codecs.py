@@ -0,0 +1,61 @@
+"""
+Decoding speed of the gateway codecs on MESSAGE_CREATE and GUILD_CREATE
+payloads of the local fake discord server.
+
+```command
+python benchmarks/codecs.py --count 20000
+```
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from pytecord.codec import CODECS, get_codec
+from pytecord.fakeserver import FakeDiscord
+from pytecord.utils import check_module
+
+REQUIREMENTS = {'orjson': 'orjson', 'msgspec': 'msgspec'}
+
+
+def payloads() -> dict[str, dict]:
+    server = FakeDiscord(guilds=1, channels=50)
+    guild = next(iter(server.guilds.values()))
+    channel = guild['channels'][0]
+    return {
+        'MESSAGE_CREATE': {'op': 0, 'd': server.make_message(channel['id'], 'hello world'), 's': 1, 't': 'MESSAGE_CREATE'},
+        'GUILD_CREATE': {'op': 0, 'd': guild, 's': 2, 't': 'GUILD_CREATE'}
+    }
+
+
+def bench(count: int) -> None:
+    events = payloads()
+    print(f'{"codec":<10}{"event":<16}{"size":>8}{"events/sec":>14}')
+
+    for name in CODECS:
+        if name in REQUIREMENTS and not check_module(REQUIREMENTS[name]):
+            print(f'{name:<10}not installed')
+            continue
+        codec = get_codec(name)
+
+        for event, payload in events.items():
+            raw = codec.dumps(payload)
+            if isinstance(raw, str):
+                raw = raw.encode()
+            loads = codec.loads
+
+            start = perf_counter()
+            for _ in range(count):
+                loads(raw)
+            elapsed = perf_counter() - start
+            print(f'{name:<10}{event:<16}{len(raw):>8}{count / elapsed:>14.0f}')
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--count', type=int, default=20000)
+    args = parser.parse_args()
+    bench(args.count)
+
+
+if __name__ == '__main__':
+    main()
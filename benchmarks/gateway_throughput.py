@@ -0,0 +1,70 @@
+"""
+Throughput and latency of MESSAGE_CREATE handling against the local fake
+discord server.
+
+```command
+python benchmarks/gateway_throughput.py --rate 5000 --count 50000
+python benchmarks/gateway_throughput.py --rate 5000 --count 50000 --codec etf
+```
+"""
+
+from argparse import ArgumentParser
+from asyncio import create_task, wait_for
+from asyncio import run as arun
+from asyncio import sleep as asleep
+from time import perf_counter, time
+
+from pytecord import Client, Message
+from pytecord.fakeserver import FakeDiscord
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] if values else 0.0
+
+
+async def bench(rate: float, count: int, guilds: int, codec: str = None, shards: int = None) -> None:
+    # every shard dispatches `count` events at `rate`
+    async with FakeDiscord(guilds=guilds, dispatch_rate=rate, dispatch_count=count, shards=shards or 1, max_concurrency=16) as server:
+        client = Client('token', api_url=server.api_url, gateway_url=server.gateway_url, codec=codec, shards=shards)
+        count *= shards or 1
+        rate *= shards or 1
+        latencies = []
+        start = None
+
+        @client.listen()
+        async def message_create(message: Message):
+            nonlocal start
+            if start is None:
+                start = perf_counter()
+            latencies.append(time() - float(message.nonce))
+
+        task = create_task(client.start())
+        await wait_for(server.dispatch_done.wait(), timeout=count / rate * 10 + 30)
+        while len(latencies) < count and not task.done():
+            await asleep(0.01)
+        elapsed = perf_counter() - start
+        await client.close()
+        await task
+
+    print(f'codec:       {client.webhook.codec.name}')
+    print(f'events:      {len(latencies)}')
+    print(f'events/sec:  {len(latencies) / elapsed:.0f} (offered {rate:.0f})')
+    print(f'latency p50: {percentile(latencies, 0.50) * 1000:.2f} ms')
+    print(f'latency p99: {percentile(latencies, 0.99) * 1000:.2f} ms')
+    print(f'max queued:  {client.webhook.dispatcher.stats.max_queued}')
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--rate', type=float, default=2000)
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--guilds', type=int, default=1)
+    parser.add_argument('--codec', choices=['json', 'orjson', 'msgspec', 'etf'])
+    parser.add_argument('--shards', type=int, help='shards (and guilds at least) of the client')
+    args = parser.parse_args()
+    arun(bench(args.rate, args.count, max(args.guilds, args.shards or 1), args.codec, args.shards))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Construction time and memory of the lazy models compared with eager models
+that parse every field in `__init__` (how models were built before). All
+messages have the same author, lazy messages share one `User` for it.
+
+```command
+python benchmarks/models.py --count 20000
+```
+"""
+
+from argparse import ArgumentParser
+from copy import deepcopy
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any
+
+from pytecord.fakeserver import FakeDiscord
+from pytecord.guild import Guild, GuildChannel, Message
+from pytecord.model import Field, Model
+from pytecord.user import User, get_user
+
+
+def eager(model: type[Model]) -> type:
+    """
+    Make a class that sets every field of the model in `__init__` and keeps
+    the payload too.
+    """
+    fields = [(name, field) for name, field in vars(model).items() if isinstance(field, Field)]
+
+    class Eager:
+        def __init__(self, data: dict[str, Any], token: str) -> None:
+            for name, field in fields:
+                value = data.get(field.key)
+                if field.model is not None:
+                    model = EAGER.get(field.model, field.model)
+                    if not value:
+                        value = None
+                    elif field.many:
+                        value = [model(i, token) for i in value]
+                    else:
+                        value = model(value, token)
+                elif field.convert is not None:
+                    value = field.convert(value)
+                setattr(self, name, value)
+            self.token = token
+            self.data = data
+
+    Eager.__name__ = f'Eager{model.__name__}'
+    return Eager
+
+
+EAGER: dict[type, type] = {}
+for model in (User, Guild, GuildChannel, Message):
+    EAGER[model] = eager(model)
+EAGER[get_user] = EAGER[User]
+
+
+def payloads(count: int) -> dict[type[Model], list[dict[str, Any]]]:
+    server = FakeDiscord(guilds=1, channels=10)
+    guild = next(iter(server.guilds.values()))
+    channel = guild['channels'][0]
+    message = server.make_message(channel['id'], 'hello world', mentions=[server.user] * 3)
+    return {
+        Message: [deepcopy(message) for _ in range(count)],
+        User: [deepcopy(message['author']) for _ in range(count)],
+        GuildChannel: [deepcopy(channel) for _ in range(count)],
+        Guild: [deepcopy(guild) for _ in range(count // 10 or 1)]
+    }
+
+
+def measure(cls: type, items: list[dict[str, Any]], touch: tuple[str, ...]) -> float:
+    begin = perf_counter()
+    objects = [cls(i, 'token') for i in items]
+    for obj in objects:
+        for name in touch:
+            getattr(obj, name)
+    return perf_counter() - begin
+
+
+def memory(cls: type, items: list[dict[str, Any]]) -> int:
+    start()
+    objects = [cls(i, 'token') for i in items]
+    result = get_traced_memory()[0]
+    stop()
+    del objects
+    return result
+
+
+TOUCH = {
+    Message: ('content', 'author'),
+    User: ('id', 'username'),
+    GuildChannel: ('id', 'name'),
+    Guild: ('id', 'name')
+}
+
+
+def bench(count: int) -> None:
+    data = payloads(count)
+    print(f'{"model":<14}{"kind":<7}{"objects/sec":>14}{"bytes/object":>14}{"+ access/sec":>14}')
+    for model, items in data.items():
+        for kind, cls in (('eager', EAGER[model]), ('lazy', model)):
+            elapsed = measure(cls, items, ())
+            accessed = measure(cls, items, TOUCH[model])
+            size = memory(cls, items)
+            print(f'{model.__name__:<14}{kind:<7}{len(items) / elapsed:>14.0f}{size / len(items):>14.0f}{len(items) / accessed:>14.0f}')
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--count', type=int, default=20000)
+    args = parser.parse_args()
+    bench(args.count)
+
+
+if __name__ == '__main__':
+    main()
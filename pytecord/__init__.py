@@ -6,3 +6,6 @@ from .user import User, GuildMember
 from .commands import Interaction
 from .presence import Presence, Activity
 from .timestamp import Timestamp
+from .snowflake import Snowflake
+from .state import ConnectionState
+from .dispatch import EventDispatcher
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable, Iterator
+
+
+class TTLCache:
+    """
+    Bounded mapping with LRU eviction. Every item can have its own time to
+    live (`ttl` in seconds, `None` means the item never expires).
+    `maxsize=None` means the cache is not bounded, `maxsize=0` disables it.
+
+    ```
+    >>> cache = TTLCache(maxsize=2, ttl=60)
+    >>> cache.set('a', 1)
+    >>> cache.get('a')
+    1
+    ```
+    """
+    def __init__(self, maxsize: int | None = 1000, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at is not None and expires_at <= monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = ...) -> None:
+        if self.maxsize == 0:
+            return
+        ttl = self.ttl if ttl is ... else ttl
+
+        self._data[key] = (monotonic() + ttl if ttl is not None else None, value)
+        self._data.move_to_end(key)
+        while self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return item[1] if item is not None else default
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def keys(self) -> Iterator[Hashable]:
+        return iter(list(self._data))
+
+    def values(self) -> Iterator[Any]:
+        return (value for _, value in list(self._data.values()))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, ...) is not ...
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResponseCache(TTLCache):
+    """
+    Cache of REST responses keyed by endpoint. The time to live is chosen
+    by the kind of the entity (`guild`, `channel`, `user`, ...).
+    """
+    def __init__(self, maxsize: int = 1000, ttls: dict[str, float] = None) -> None:
+        super().__init__(maxsize)
+        self.ttls = {
+            'guild': 60.0,
+            'channel': 60.0,
+            'user': 300.0
+        }
+        if ttls:
+            self.ttls.update(ttls)
+
+    def set(self, key: str, value: Any, ttl: float | str | None = ...) -> None:
+        if isinstance(ttl, str):
+            ttl = self.ttls.get(ttl, self.ttl)
+        super().set(key, value, ttl)
+
+    def invalidate(self, endpoint: str) -> None:
+        """
+        Remove the cached response of the endpoint.
+        """
+        self.pop(endpoint)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """
+        Remove cached responses of all endpoints starting with `prefix`
+        (for example `/guilds/123` removes the guild and its channels).
+        """
+        for key in self.keys():
+            if key == prefix or key.startswith(prefix + '/'):
+                self.pop(key)
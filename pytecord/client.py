@@ -1,27 +1,59 @@
 from asyncio import run as arun
 from inspect import getdoc, signature, _empty
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, Literal
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Coroutine, Literal
 
 from .commands import AppllicationCommand, AppllicationCommandOption
-from .enums import ApplicationCommandType, GatewayIntents
+from .dispatch import EventDispatcher
+from .enums import GATEWAY_EVENTS, ApplicationCommandType, GatewayIntents
 from .guild import Guild, GuildChannel, Message, MessageDeleteEvent
-from .user import User
-from .utils import get_option_type, rget
+from .metrics import RollingHistogram
+from .user import GuildMember, GuildMembersChunk, User
+from .utils import get_option_type
 from .web import BaseWebhook
 from .presence import Presence
+from .state import ConnectionState
 from .timer import TimerLoop, At
+from .tracing import GatewayTracer
 
 if TYPE_CHECKING:
+    from .cluster import ClusterWorker
     from .web import GatewayOutput
 
 class Client:
-    def __init__(self, token: str, debug: bool = False) -> None:
-        self.webhook = BaseWebhook(token, debug)
+    def __init__(
+            self,
+            token: str,
+            debug: bool = False,
+            *,
+            commands_cache: str = None,
+            state: ConnectionState = None,
+            api_url: str = None,
+            gateway_url: str = None,
+            compress: bool = False,
+            codec: str = None,
+            shards: int | Literal['auto'] | None = None,
+            shard_ids: list[int] = None,
+            dispatcher: EventDispatcher = None,
+            tracer: GatewayTracer = None,
+            intents: int = 0
+        ) -> None:
+        self.webhook = BaseWebhook(
+            token, debug, commands_cache, state,
+            api_url=api_url, gateway_url=gateway_url, compress=compress, codec=codec,
+            shards=shards, shard_ids=shard_ids, dispatcher=dispatcher, tracer=tracer
+        )
         self.token = token
         self.__timers: list[TimerLoop] = []
         self.__ats: list[At] = []
-        self.__intents = GatewayIntents.GUILD_INTEGRATIONS
+        self.__timers_started = False
+        # `intents` adds intents that listeners don't need, like `GUILD_MEMBERS`
+        # for `request_members`
+        self.__intents = GatewayIntents.GUILDS | GatewayIntents.GUILD_INTEGRATIONS | intents
         self.__presence = None
+        # worker of the cluster that runs the client (see `pytecord.cluster`)
+        self.cluster: 'ClusterWorker | None' = None
+
+        self.webhook.add_event('READY', self.__ready)
     
     @property
     def user(self) -> User:
@@ -29,8 +61,27 @@ class Client:
     
     @property
     def guilds(self) -> list[Guild]:
+        """
+        Guilds of the bot. It blocks, so use `await client.fetch_guilds()`
+        in handlers.
+        """
         return self.webhook.get_current_user_guilds()
     
+    @property
+    def latency(self) -> float:
+        """
+        Time between the last heartbeat and its ACK in seconds (`inf` before
+        the first ACK). With sharding it is the mean latency of the shards.
+        """
+        return self.webhook.latency
+
+    @property
+    def latencies(self) -> RollingHistogram:
+        """
+        Latencies of the latest heartbeats.
+        """
+        return self.webhook.latencies
+
     @property
     def presence(self) -> Presence:
         return self.__presence
@@ -41,41 +92,67 @@ class Client:
         self.__presence.register(self.webhook)
         return self.__presence
 
-    def listen(self):
+    def listen(self, event: str = None):
+        """
+        Add a handler of a gateway event. The event is the name of the
+        function (or `event`), for example `message_create` or
+        `guild_member_add`. Every event can have many handlers.
+
+        `ready` handlers get no arguments, `message_create`,
+        `message_update` and `message_delete` handlers get models, handlers
+        of other events get the raw payload (`dict`).
+        """
         def decorator(func_to_decorate: Callable[..., Coroutine[Any, Any, Any]]):
-            event_name = func_to_decorate.__name__
+            event_name = event or func_to_decorate.__name__
 
             if event_name == 'message':
                 event_name = 'message_create'
+            event_type = event_name.upper()
+            if event_type not in GATEWAY_EVENTS:
+                raise ValueError('Invalid event name: %s' % event_name)
+            self.__intents |= GATEWAY_EVENTS[event_type]
 
             match event_name:
                 case 'ready':
                     async def func(data: 'GatewayOutput'):
-                        for i in self.__timers:
-                            i.run()
-                        await self.webhook.register_app_commands(data)
                         await func_to_decorate()
 
                 case 'message_create' | 'message_update':
-                    self.__intents += GatewayIntents.GUILD_MESSAGES
-                    self.__intents += GatewayIntents.MESSAGE_CONTENT
-                    self.__intents += GatewayIntents.DIRECT_MESSAGES
                     async def func(data: 'GatewayOutput'):
                         if not data.d['author'].get('bot', False):
                             message = Message(data.d, self.token)
                             await func_to_decorate(message)
 
                 case 'message_delete':
-                    self.__intents += GatewayIntents.GUILD_MESSAGES
-                    self.__intents += GatewayIntents.DIRECT_MESSAGES
                     async def func(data: 'GatewayOutput'):
                         event = MessageDeleteEvent(data.d, self.token)
                         await func_to_decorate(event)
+
                 case _:
-                    raise ValueError('Invalid event name: %s' % event_name)
+                    async def func(data: 'GatewayOutput'):
+                        await func_to_decorate(data.d)
+
+            self.webhook.add_event(event_type, func)
+            return func_to_decorate
+
+        return decorator
 
-            self.webhook.add_event(event_name.upper(), func)
+    def middleware(self, events: list[str] = None):
+        """
+        Add a middleware of gateway events (`events` are names like
+        `message_create`, all events by default). The middleware gets the
+        gateway payload before the handlers and returns `False` to drop it.
 
+        ```
+        >>> @client.middleware(['message_create'])
+        ... def only_guilds(data):
+        ...     return 'guild_id' in data.d
+        ```
+        """
+        def decorator(func_to_decorate: Callable[['GatewayOutput'], bool]):
+            types = [i.upper() for i in events] if events is not None else None
+            self.webhook.add_middleware(func_to_decorate, types)
+            return func_to_decorate
         return decorator
     
     def timer(self, *, days: int = 0, hours: int = 0, minutes: int = 0, seconds: int = 0):
@@ -108,21 +185,65 @@ class Client:
             self.webhook.add_command(command, func_to_decorate)
         return wrapper
     
-    def get_guild(self, id: int) -> Guild:
-        return self.webhook.get_guild(id)
+    def get_guild(self, id: int, *, fresh: bool = False) -> Guild:
+        return self.webhook.get_guild(id, fresh=fresh)
     
-    def get_channel(self, id: int) -> GuildChannel:
-        return self.webhook.get_channel(id)
+    def get_channel(self, id: int, *, fresh: bool = False) -> GuildChannel:
+        return self.webhook.get_channel(id, fresh=fresh)
+
+    async def fetch_current_user(self, *, fresh: bool = False) -> User:
+        return await self.webhook.fetch_current_user(fresh=fresh)
+
+    async def fetch_guilds(self, *, partial: bool = False, concurrency: int = 10) -> list[Guild]:
+        return await self.webhook.fetch_current_user_guilds(partial=partial, concurrency=concurrency)
+
+    def iter_guilds(self, *, partial: bool = False, concurrency: int = 10) -> AsyncIterator[Guild]:
+        return self.webhook.iter_current_user_guilds(partial=partial, concurrency=concurrency)
+
+    async def fetch_guild(self, id: int, *, fresh: bool = False) -> Guild:
+        return await self.webhook.fetch_guild(id, fresh=fresh)
+
+    async def fetch_channel(self, id: int, *, fresh: bool = False) -> GuildChannel:
+        return await self.webhook.fetch_channel(id, fresh=fresh)
+
+    def request_members(
+            self,
+            guild_id: int,
+            *,
+            query: str = '',
+            limit: int = 0,
+            user_ids: list[int] = None,
+            presences: bool = False,
+            cache: bool = True,
+            timeout: float = 30.0
+        ) -> AsyncIterator[GuildMembersChunk]:
+        return self.webhook.request_members(
+            guild_id,
+            query=query, limit=limit, user_ids=user_ids, presences=presences, cache=cache, timeout=timeout
+        )
+
+    async def fetch_members(self, guild_id: int, **kwargs) -> list[GuildMember]:
+        return await self.webhook.fetch_members_chunked(guild_id, **kwargs)
+
+    async def __ready(self, data: 'GatewayOutput'):
+        # READY is received by every shard and after every new session
+        if self.cluster is not None and self.cluster.cluster_id != 0:
+            return # other workers of the cluster would run timers and sync commands again
+        if not self.__timers_started:
+            self.__timers_started = True
+            for i in self.__timers:
+                i.run()
+        await self.webhook.register_app_commands(data)
+
+    async def start(self):
+        self.__presence = Presence([])
+        await self.webhook.run(self.__intents)
+
+    async def close(self):
+        await self.webhook.close()
 
     def run(self):
-        if not self.webhook.listener.events.get('READY'):
-            async def func(data: 'GatewayOutput'):
-                for i in self.__timers:
-                    i.run()
-                await self.webhook.register_app_commands(data)
-            self.webhook.add_event('READY', func)
         try:
-            self.__presence = Presence([])
-            arun(self.webhook.run(self.__intents))
+            arun(self.start())
         except KeyboardInterrupt:
             exit(0)
@@ -0,0 +1,351 @@
+"""
+Run the shards of one client in several processes.
+
+```
+>>> client = Client('token')
+>>> cluster = Cluster(client, clusters=4)
+>>> @cluster.handler()
+... def member_count():
+...     return sum(i.get('member_count', 0) for i in client.webhook.state.guilds.values())
+>>> @client.listen()
+... async def ready():
+...     print(sum(await client.cluster.query('member_count')))
+>>> cluster.run()
+```
+
+Workers are forked from the process that calls `Cluster.run`, so every
+handler registered on the client before is run by all workers. Timers and
+application command sync run only in cluster 0. The parent process orders
+IDENTIFY of all shards and forwards queries between workers over
+multiprocessing pipes.
+"""
+
+from asyncio import Future, get_running_loop
+from asyncio import run as arun
+from asyncio import sleep as asleep
+from concurrent.futures import Future as ThreadFuture
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from os import cpu_count
+from threading import Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Literal
+
+from .utils import rget
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+def _send(conn: Connection, lock: Lock, message: tuple) -> None:
+    with lock:
+        conn.send(message)
+
+
+class ClusterWorker:
+    """
+    Worker process of a cluster. It runs `shard_ids` of the client and is
+    available in handlers as `client.cluster`.
+
+    Queries are answered by the handlers registered with `handler` (here or
+    with `Cluster.handler` before the fork), `guild_count`, `get_guild` and
+    `get_channel` are there by default.
+    """
+    def __init__(
+            self,
+            client: 'Client',
+            cluster_id: int,
+            shard_ids: list[int],
+            shard_count: int,
+            conn: Connection,
+            handlers: dict[str, Callable[..., Any]] = None
+        ) -> None:
+        self.client = client
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+
+        self.handlers: dict[str, Callable[..., Any]] = {
+            'guild_count': lambda: len(client.webhook.state.guilds),
+            'get_guild': client.webhook.state.get_guild,
+            'get_channel': client.webhook.state.get_channel
+        }
+        self.handlers.update(handlers or {})
+
+        self.__conn = conn
+        self.__lock = Lock()
+        self.__ids = count()
+        self.__pending: dict[int, Future] = {}
+
+    def handler(self, name: str = None):
+        """
+        Register a function (sync or async) that answers queries `name` of
+        other workers.
+        """
+        def decorator(func: Callable[..., Any]):
+            self.handlers[name or func.__name__] = func
+            return func
+        return decorator
+
+    async def request(self, op: str, *args) -> Any:
+        id = next(self.__ids)
+        future = self.__pending[id] = get_running_loop().create_future()
+        _send(self.__conn, self.__lock, ('request', id, op, args))
+        try:
+            return await future
+        finally:
+            self.__pending.pop(id, None)
+
+    async def acquire(self, shard_id: int) -> None:
+        """
+        Wait until the shard can identify (used as the identify limiter of
+        the client).
+        """
+        await asleep(await self.request('identify', shard_id))
+
+    async def query(self, name: str, *args) -> list[Any]:
+        """
+        Run the query handler `name` in every worker. Returns results of all
+        workers in the order of their cluster ids.
+        """
+        return await self.request('query', name, args)
+
+    async def guild_count(self) -> int:
+        return sum(await self.query('guild_count'))
+
+    async def get_guild(self, id: int) -> dict[str, Any] | None:
+        """
+        Get a guild from the state of the worker that runs its shard.
+        """
+        return next((i for i in await self.query('get_guild', id) if i is not None), None)
+
+    async def get_channel(self, id: int) -> dict[str, Any] | None:
+        return next((i for i in await self.query('get_channel', id) if i is not None), None)
+
+    def __receive(self) -> None:
+        while self.__conn.poll():
+            try:
+                kind, id, *message = self.__conn.recv()
+            except EOFError:
+                get_running_loop().remove_reader(self.__conn.fileno())
+                return
+
+            if kind == 'response':
+                ok, value = message
+                if (future := self.__pending.get(id)) is not None and not future.done():
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+            else:
+                get_running_loop().create_task(self.__answer(id, *message))
+
+    async def __answer(self, id: int, name: str, args: tuple) -> None:
+        try:
+            result = self.handlers[name](*args)
+            if hasattr(result, '__await__'):
+                result = await result
+            message = ('response', id, True, result)
+        except Exception as e:
+            message = ('response', id, False, e)
+        _send(self.__conn, self.__lock, message)
+
+    async def start(self) -> None:
+        get_running_loop().add_reader(self.__conn.fileno(), self.__receive)
+
+        webhook = self.client.webhook
+        webhook.shard_count = self.shard_count
+        webhook.shard_ids = self.shard_ids
+        webhook.identify_limiter = self
+        webhook.make_streams()
+        self.client.cluster = self
+
+        try:
+            await self.client.start()
+        finally:
+            get_running_loop().remove_reader(self.__conn.fileno())
+
+
+def _run_worker(
+        client: 'Client',
+        cluster_id: int,
+        shard_ids: list[int],
+        shard_count: int,
+        conn: Connection,
+        handlers: dict[str, Callable[..., Any]]
+    ) -> None:
+    try:
+        arun(ClusterWorker(client, cluster_id, shard_ids, shard_count, conn, handlers).start())
+    except KeyboardInterrupt:
+        pass
+
+
+class Cluster:
+    """
+    Run shards of a client in `clusters` processes (one per CPU by default),
+    so JSON decoding and handlers of different shards use different cores.
+    With `shards='auto'` the recommended shard count is fetched from
+    `/gateway/bot`.
+
+    Workers are started with `fork`, so clusters are only available on
+    platforms that support it.
+    """
+    def __init__(
+            self,
+            client: 'Client',
+            clusters: int = None,
+            shards: int | Literal['auto'] = 'auto',
+            *,
+            identify_interval: float = 5.0,
+            query_timeout: float = 10.0
+        ) -> None:
+        self.client = client
+        self.clusters = clusters or cpu_count() or 1
+        self.shards = shards
+        self.identify_interval = identify_interval
+        self.query_timeout = query_timeout
+        self.max_concurrency = 1
+        self.handlers: dict[str, Callable[..., Any]] = {}
+
+        self.processes = []
+        self.__conns: list[Connection] = []
+        self.__locks: list[Lock] = []
+        self.__ids = count()
+        self.__pending: dict[int, ThreadFuture] = {}
+        self.__identify_lock = Lock()
+        self.__identify_last: dict[int, float] = {}
+        self.__executor = ThreadPoolExecutor()
+
+    def handler(self, name: str = None):
+        """
+        Register a function (sync or async) that answers queries `name` in
+        every worker. Unlike `ClusterWorker.handler` it can be used before
+        `run()`.
+        """
+        def decorator(func: Callable[..., Any]):
+            self.handlers[name or func.__name__] = func
+            return func
+        return decorator
+
+    def get_shard_ids(self, shard_count: int) -> list[list[int]]:
+        """
+        Split shards into contiguous ranges of the clusters.
+        """
+        clusters = min(self.clusters, shard_count)
+        size, rest = divmod(shard_count, clusters)
+        result, start = [], 0
+        for i in range(clusters):
+            end = start + size + (i < rest)
+            result.append(list(range(start, end)))
+            start = end
+        return result
+
+    def run(self) -> None:
+        shard_count = self.shards
+        gateway = rget('/gateway/bot', self.client.token).json()
+        self.max_concurrency = gateway['session_start_limit']['max_concurrency']
+        if shard_count == 'auto':
+            shard_count = gateway['shards']
+
+        context = get_context('fork')
+        readers = []
+        for cluster_id, shard_ids in enumerate(self.get_shard_ids(shard_count)):
+            conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_run_worker,
+                args=(self.client, cluster_id, shard_ids, shard_count, child_conn, self.handlers),
+                name=f'pytecord-cluster-{cluster_id}'
+            )
+            process.start()
+            child_conn.close()
+
+            self.processes.append(process)
+            self.__conns.append(conn)
+            self.__locks.append(Lock())
+            readers.append(Thread(target=self.__read, args=(cluster_id,), daemon=True))
+
+        for reader in readers:
+            reader.start()
+        try:
+            for process in self.processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in self.processes:
+                process.join()
+        finally:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self) -> None:
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+
+    # Coordinator
+
+    def __read(self, cluster_id: int) -> None:
+        conn = self.__conns[cluster_id]
+        while True:
+            try:
+                kind, id, *message = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            if kind == 'response':
+                if (future := self.__pending.pop(id, None)) is not None:
+                    future.set_result(message)
+            else:
+                self.__executor.submit(self.__answer, cluster_id, id, *message)
+
+    def __answer(self, cluster_id: int, id: int, op: str, args: tuple) -> None:
+        try:
+            match op:
+                case 'identify':
+                    result = self.__identify(*args)
+                case 'query':
+                    result = self.__query(*args)
+                case _:
+                    raise ValueError(f'Unknown cluster request: {op}')
+            message = ('response', id, True, result)
+        except Exception as e:
+            message = ('response', id, False, e)
+        try:
+            _send(self.__conns[cluster_id], self.__locks[cluster_id], message)
+        except OSError: # the worker has exited
+            pass
+
+    def __identify(self, shard_id: int) -> float:
+        # book the next free slot of the rate limit key, the worker waits for it
+        key = shard_id % self.max_concurrency
+        with self.__identify_lock:
+            now = monotonic()
+            at = now if (last := self.__identify_last.get(key)) is None else max(last + self.identify_interval, now)
+            self.__identify_last[key] = at
+        return at - now
+
+    def __query(self, name: str, args: tuple) -> list[Any]:
+        ids, futures = [], []
+        try:
+            for cluster_id, conn in enumerate(self.__conns):
+                id = next(self.__ids)
+                future = self.__pending[id] = ThreadFuture()
+                ids.append(id)
+                futures.append(future)
+                try:
+                    _send(conn, self.__locks[cluster_id], ('request', id, name, args))
+                except OSError:
+                    self.__pending.pop(id, None)
+                    future.set_result((True, None))
+
+            result = []
+            for future in futures:
+                ok, value = future.result(timeout=self.query_timeout)
+                if not ok:
+                    raise value
+                result.append(value)
+            return result
+        finally:
+            # answers that come later (or never) are dropped
+            for id in ids:
+                self.__pending.pop(id, None)
@@ -0,0 +1,290 @@
+import json
+from struct import Struct
+from typing import Any
+from zlib import decompress
+
+from .interfaces import BaseCodec
+from .utils import check_module
+
+
+class JSONCodec(BaseCodec):
+    name = 'json'
+    encoding = 'json'
+
+    def __init__(self) -> None:
+        self.__decoder = json.JSONDecoder()
+        self.__encoder = json.JSONEncoder(separators=(',', ':'))
+
+    def loads(self, data: str | bytes) -> Any:
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode()
+        return self.__decoder.decode(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self.__encoder.encode(obj)
+
+
+class OrjsonCodec(BaseCodec):
+    name = 'orjson'
+    encoding = 'json'
+
+    def __init__(self) -> None:
+        import orjson
+        self.__loads = orjson.loads
+        self.__dumps = orjson.dumps
+
+    def loads(self, data: str | bytes) -> Any:
+        return self.__loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self.__dumps(obj).decode()
+
+
+class MsgspecCodec(BaseCodec):
+    name = 'msgspec'
+    encoding = 'json'
+
+    def __init__(self) -> None:
+        import msgspec
+        self.__decode = msgspec.json.Decoder().decode
+        self.__encode = msgspec.json.Encoder().encode
+
+    def loads(self, data: str | bytes) -> Any:
+        return self.__decode(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self.__encode(obj).decode()
+
+
+# Erlang External Term Format
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+MAP_EXT = 116
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+FORMAT_VERSION = 131
+
+_uint16 = Struct('>H')
+_uint32 = Struct('>I')
+_int32 = Struct('>i')
+_double = Struct('>d')
+
+_ATOMS = {'nil': None, 'true': True, 'false': False}
+
+
+def etf_loads(data: bytes) -> Any:
+    """
+    Decode the Erlang External Term Format (`encoding=etf` of the gateway).
+    Binaries are decoded as `str`, atoms `nil`, `true` and `false` as
+    `None`, `True` and `False`, other atoms as `str`.
+    """
+    data = memoryview(data)
+    if data[0] != FORMAT_VERSION:
+        raise ValueError('Unknown ETF version: %s' % data[0])
+    if data[1] == COMPRESSED:
+        data = memoryview(b'\x83' + decompress(data[6:]))
+
+    uint16 = _uint16.unpack_from
+    uint32 = _uint32.unpack_from
+    int32 = _int32.unpack_from
+    double = _double.unpack_from
+    atoms = _ATOMS
+
+    def atom(name: str) -> Any:
+        return atoms.get(name, name)
+
+    def decode(i: int) -> tuple[Any, int]:
+        tag = data[i]
+        i += 1
+
+        if tag == BINARY_EXT:
+            size = uint32(data, i)[0]
+            i += 4
+            return str(data[i:i + size], 'utf-8'), i + size
+        if tag == SMALL_ATOM_UTF8_EXT or tag == SMALL_ATOM_EXT:
+            size = data[i]
+            i += 1
+            return atom(str(data[i:i + size], 'utf-8')), i + size
+        if tag == SMALL_INTEGER_EXT:
+            return data[i], i + 1
+        if tag == MAP_EXT:
+            arity = uint32(data, i)[0]
+            i += 4
+            result = {}
+            for _ in range(arity):
+                key, i = decode(i)
+                result[key], i = decode(i)
+            return result, i
+        if tag == LIST_EXT:
+            size = uint32(data, i)[0]
+            i += 4
+            result = []
+            for _ in range(size):
+                value, i = decode(i)
+                result.append(value)
+            _, i = decode(i)  # tail, NIL_EXT for proper lists
+            return result, i
+        if tag == NIL_EXT:
+            return [], i
+        if tag == INTEGER_EXT:
+            return int32(data, i)[0], i + 4
+        if tag == SMALL_BIG_EXT or tag == LARGE_BIG_EXT:
+            if tag == SMALL_BIG_EXT:
+                size = data[i]
+                i += 1
+            else:
+                size = uint32(data, i)[0]
+                i += 4
+            sign = data[i]
+            value = int.from_bytes(data[i + 1:i + 1 + size], 'little')
+            return -value if sign else value, i + 1 + size
+        if tag == ATOM_UTF8_EXT or tag == ATOM_EXT:
+            size = uint16(data, i)[0]
+            i += 2
+            return atom(str(data[i:i + size], 'utf-8')), i + size
+        if tag == NEW_FLOAT_EXT:
+            return double(data, i)[0], i + 8
+        if tag == FLOAT_EXT:
+            return float(str(data[i:i + 31], 'ascii').rstrip('\x00')), i + 31
+        if tag == STRING_EXT:
+            size = uint16(data, i)[0]
+            i += 2
+            return str(data[i:i + size], 'latin-1'), i + size
+        if tag == SMALL_TUPLE_EXT or tag == LARGE_TUPLE_EXT:
+            if tag == SMALL_TUPLE_EXT:
+                arity = data[i]
+                i += 1
+            else:
+                arity = uint32(data, i)[0]
+                i += 4
+            result = []
+            for _ in range(arity):
+                value, i = decode(i)
+                result.append(value)
+            return tuple(result), i
+        raise ValueError('Unknown ETF tag: %s' % tag)
+
+    return decode(1)[0]
+
+
+def etf_dumps(obj: Any) -> bytes:
+    """
+    Encode an object to the Erlang External Term Format.
+    """
+    result = bytearray([FORMAT_VERSION])
+
+    def atom(name: str):
+        encoded = name.encode()
+        result.append(SMALL_ATOM_UTF8_EXT)
+        result.append(len(encoded))
+        result.extend(encoded)
+
+    def encode(value: Any):
+        if value is None:
+            atom('nil')
+        elif value is True:
+            atom('true')
+        elif value is False:
+            atom('false')
+        elif isinstance(value, str):
+            encoded = value.encode()
+            result.append(BINARY_EXT)
+            result.extend(_uint32.pack(len(encoded)))
+            result.extend(encoded)
+        elif isinstance(value, int):
+            if 0 <= value <= 255:
+                result.append(SMALL_INTEGER_EXT)
+                result.append(value)
+            elif -2 ** 31 <= value < 2 ** 31:
+                result.append(INTEGER_EXT)
+                result.extend(_int32.pack(value))
+            else:
+                encoded = abs(value).to_bytes((abs(value).bit_length() + 7) // 8, 'little')
+                result.append(SMALL_BIG_EXT)
+                result.append(len(encoded))
+                result.append(1 if value < 0 else 0)
+                result.extend(encoded)
+        elif isinstance(value, float):
+            result.append(NEW_FLOAT_EXT)
+            result.extend(_double.pack(value))
+        elif isinstance(value, dict):
+            result.append(MAP_EXT)
+            result.extend(_uint32.pack(len(value)))
+            for k, v in value.items():
+                encode(k)
+                encode(v)
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                result.append(NIL_EXT)
+                return
+            result.append(LIST_EXT)
+            result.extend(_uint32.pack(len(value)))
+            for i in value:
+                encode(i)
+            result.append(NIL_EXT)
+        elif isinstance(value, (bytes, bytearray)):
+            result.append(BINARY_EXT)
+            result.extend(_uint32.pack(len(value)))
+            result.extend(value)
+        else:
+            raise TypeError('Object of type %s is not ETF serializable' % type(value).__name__)
+
+    encode(obj)
+    return bytes(result)
+
+
+class ETFCodec(BaseCodec):
+    """
+    Erlang External Term Format codec for `encoding=etf` of the gateway.
+    Note that snowflakes are integers (not strings) in ETF payloads.
+
+    The codec is written in pure Python and decodes payloads several times
+    slower than the JSON codecs (about 8 times slower than `json` and 18
+    times slower than `orjson` on MESSAGE_CREATE, see
+    `benchmarks/codecs.py`). It exists only for compatibility, use a JSON
+    codec unless ETF is required.
+    """
+    name = 'etf'
+    encoding = 'etf'
+
+    def loads(self, data: bytes) -> Any:
+        return etf_loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return etf_dumps(obj)
+
+
+CODECS: dict[str, type[BaseCodec]] = {
+    'json': JSONCodec,
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+    'etf': ETFCodec
+}
+
+def get_codec(name: str = None) -> BaseCodec:
+    """
+    Get a codec by its name (`json`, `orjson`, `msgspec` or `etf`). Without
+    a name the fastest installed JSON codec is used: msgspec, orjson or the
+    standard library `json`. `etf` is never chosen by default, because it is
+    slower than every JSON codec.
+    """
+    if name is not None:
+        return CODECS[name]()
+    for module in ('msgspec', 'orjson'):
+        if check_module(module):
+            return CODECS[module]()
+    return JSONCodec()
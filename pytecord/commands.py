@@ -1,3 +1,5 @@
+from hashlib import sha256
+from json import dumps
 from typing import Any, Literal
 from .interfaces import Object
 from .utils import MessagePayload, apost, get_snowflake
@@ -41,7 +43,7 @@ class AppllicationCommand:
             type = data.get('type', 1)
             name = data['name']
             description = data.get('description', '...')
-            options = [AppllicationCommandOption(data=i) for i in data.get('options', [])]
+            options = [AppllicationCommandOption(i['type'], i['name'], data=i) for i in data.get('options', [])]
         self.id: int = int(data.get('id')) if data else None
         self.type: int = type
         self.application_id: int = int(data.get('application_id')) if data else None
@@ -55,7 +57,7 @@ class AppllicationCommand:
         self.nsfw = ...
         self.version: int = int(data.get('version')) if data else None
 
-        self.__guild_id = int(data.get('guild_id')) if data else None
+        self.__guild_id = get_snowflake(data.get('guild_id')) if data else None
         self.__token = token if data else None
 
     def eval(self) -> dict[str, Any]:
@@ -67,6 +69,17 @@ class AppllicationCommand:
         }
 
 
+def get_commands_hash(commands: list[dict[str, Any]]) -> str:
+    """
+    Get the fingerprint of evaluated application commands. Order of the
+    commands doesn't matter.
+    """
+    # discord returns an empty description for USER and MESSAGE commands
+    commands = [dict(i, description='') if i['type'] in (2, 3) else i for i in commands]
+    commands = sorted(commands, key=lambda i: (i['type'], i['name']))
+    return sha256(dumps(commands, sort_keys=True).encode()).hexdigest()
+
+
 class Interaction(Object):
     def __init__(self, data: dict[str, Any], token: str) -> None:
         self.id = get_snowflake(data.get('id'))
@@ -1,2 +1,5 @@
 GATEWAY_VERSION = 10
 API_VERSION = 10
+
+API_URL = 'https://discord.com/api'
+GATEWAY_URL = 'wss://gateway.discord.gg'
@@ -0,0 +1,149 @@
+from asyncio import CancelledError, Queue, Semaphore, Task, create_task
+from collections import deque
+from logging import getLogger
+from random import random
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Hashable, Literal
+
+from .metrics import RollingHistogram
+
+_log = getLogger(__name__)
+
+if TYPE_CHECKING:
+    from .web import GatewayOutput
+
+Handler = Callable[['GatewayOutput'], Coroutine[Any, Any, Any]]
+Middleware = Callable[['GatewayOutput'], bool]
+KEYS: dict[str, Callable[['GatewayOutput'], Hashable]] = {
+    'channel': lambda request: request.d.get('channel_id') if isinstance(request.d, dict) else None,
+    'guild': lambda request: request.d.get('guild_id') if isinstance(request.d, dict) else None
+}
+
+
+def sample(rate: float) -> Middleware:
+    """
+    Middleware that passes only a random `rate` part (from `0` to `1`) of
+    the events.
+    """
+    def middleware(request: 'GatewayOutput') -> bool:
+        return random() < rate
+    return middleware
+
+
+class DispatchStats:
+    """
+    Counters of the event dispatcher. `queued` is the number of events
+    waiting for a worker, `handler_times` keeps how long the latest
+    handlers ran in seconds.
+    """
+    def __init__(self) -> None:
+        self.dispatched = 0
+        self.completed = 0
+        self.failed = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.running = 0
+        self.handler_times = RollingHistogram(bounds=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+
+
+class EventDispatcher:
+    """
+    Runs event handlers in a pool of `max_concurrency` worker tasks, so a
+    slow handler doesn't stop the gateway connection from being read.
+
+    Events with the same key (`ordered_by='channel'` or `'guild'` or a
+    function that gets the key of an event, `None` to turn it off) are
+    handled one after another in the order they were received. At most
+    `max_queue + max_concurrency` events are queued or running, when there
+    are more the reader of the connection waits (heartbeats are still sent).
+    """
+    def __init__(
+            self,
+            max_concurrency: int = 100,
+            max_queue: int = 1000,
+            ordered_by: Literal['channel', 'guild'] | Callable[['GatewayOutput'], Hashable] | None = 'channel',
+            on_error: Callable[[BaseException, 'GatewayOutput'], Any] = None
+        ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.key = KEYS[ordered_by] if isinstance(ordered_by, str) else ordered_by
+        self.on_error = on_error
+        self.stats = DispatchStats()
+
+        self.__queue: Queue[tuple[Hashable, Handler, 'GatewayOutput']] | None = None
+        self.__capacity: Semaphore | None = None
+        self.__workers: list[Task] = []
+        # events of keys that are being handled now wait here
+        self.__keys: dict[Hashable, deque[tuple[Handler, 'GatewayOutput']]] = {}
+
+    async def submit(self, handler: Handler, request: 'GatewayOutput') -> None:
+        """
+        Queue the handler. Returns when the event is queued, not when it is
+        handled.
+        """
+        if self.__queue is None:
+            self.start()
+        await self.__capacity.acquire()
+
+        stats = self.stats
+        stats.dispatched += 1
+        stats.queued += 1
+        if stats.queued > stats.max_queued:
+            stats.max_queued = stats.queued
+        self.__queue.put_nowait((self.key(request) if self.key else None, handler, request))
+
+    def start(self) -> None:
+        self.__queue = Queue()
+        self.__capacity = Semaphore(self.max_queue + self.max_concurrency)
+        self.__workers = [create_task(self.__work()) for _ in range(self.max_concurrency)]
+
+    async def close(self) -> None:
+        for worker in self.__workers:
+            worker.cancel()
+        self.__workers = []
+        self.__queue = None
+        self.__keys.clear()
+
+    @property
+    def queued(self) -> int:
+        return self.stats.queued
+
+    async def __work(self) -> None:
+        queue = self.__queue
+        keys = self.__keys
+        while True:
+            key, handler, request = await queue.get()
+
+            if key is not None:
+                if key in keys: # another worker handles this key, it takes the event
+                    keys[key].append((handler, request))
+                    continue
+                keys[key] = deque()
+
+            await self.__run(handler, request)
+            if key is not None:
+                pending = keys[key]
+                while pending:
+                    await self.__run(*pending.popleft())
+                del keys[key]
+
+    async def __run(self, handler: Handler, request: 'GatewayOutput') -> None:
+        stats = self.stats
+        stats.queued -= 1
+        stats.running += 1
+        start = perf_counter()
+        try:
+            await handler(request)
+        except CancelledError:
+            raise
+        except Exception as e:
+            stats.failed += 1
+            if self.on_error is not None:
+                self.on_error(e, request)
+            else:
+                _log.error('Handler of %s failed', request.t, exc_info=e)
+        finally:
+            stats.running -= 1
+            stats.completed += 1
+            stats.handler_times.add(perf_counter() - start)
+            self.__capacity.release()
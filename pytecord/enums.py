@@ -47,3 +47,75 @@ class GatewayIntents:
     GUILD_SCHEDULED_EVENTS = 1 << 16
     AUTO_MODERATION_CONFIGURATION = 1 << 20
     AUTO_MODERATION_EXECUTION = 1 << 21
+
+
+_GUILD_AND_DM_MESSAGES = GatewayIntents.GUILD_MESSAGES | GatewayIntents.DIRECT_MESSAGES
+_REACTIONS = GatewayIntents.GUILD_MESSAGE_REACTIONS | GatewayIntents.DIRECT_MESSAGE_REACTIONS
+
+# Gateway dispatch events and the intents needed to receive them
+GATEWAY_EVENTS: dict[str, int] = {
+    'READY': 0,
+    'RESUMED': 0,
+    'APPLICATION_COMMAND_PERMISSIONS_UPDATE': 0,
+    'INTERACTION_CREATE': 0,
+    'USER_UPDATE': 0,
+    'VOICE_SERVER_UPDATE': 0,
+    'GUILD_MEMBERS_CHUNK': 0,
+    'ENTITLEMENT_CREATE': 0,
+    'ENTITLEMENT_UPDATE': 0,
+    'ENTITLEMENT_DELETE': 0,
+    'GUILD_CREATE': GatewayIntents.GUILDS,
+    'GUILD_UPDATE': GatewayIntents.GUILDS,
+    'GUILD_DELETE': GatewayIntents.GUILDS,
+    'GUILD_ROLE_CREATE': GatewayIntents.GUILDS,
+    'GUILD_ROLE_UPDATE': GatewayIntents.GUILDS,
+    'GUILD_ROLE_DELETE': GatewayIntents.GUILDS,
+    'CHANNEL_CREATE': GatewayIntents.GUILDS,
+    'CHANNEL_UPDATE': GatewayIntents.GUILDS,
+    'CHANNEL_DELETE': GatewayIntents.GUILDS,
+    'CHANNEL_PINS_UPDATE': GatewayIntents.GUILDS | GatewayIntents.DIRECT_MESSAGES,
+    'THREAD_CREATE': GatewayIntents.GUILDS,
+    'THREAD_UPDATE': GatewayIntents.GUILDS,
+    'THREAD_DELETE': GatewayIntents.GUILDS,
+    'THREAD_LIST_SYNC': GatewayIntents.GUILDS,
+    'THREAD_MEMBER_UPDATE': GatewayIntents.GUILDS,
+    'THREAD_MEMBERS_UPDATE': GatewayIntents.GUILDS | GatewayIntents.GUILD_MEMBERS,
+    'STAGE_INSTANCE_CREATE': GatewayIntents.GUILDS,
+    'STAGE_INSTANCE_UPDATE': GatewayIntents.GUILDS,
+    'STAGE_INSTANCE_DELETE': GatewayIntents.GUILDS,
+    'GUILD_MEMBER_ADD': GatewayIntents.GUILD_MEMBERS,
+    'GUILD_MEMBER_UPDATE': GatewayIntents.GUILD_MEMBERS,
+    'GUILD_MEMBER_REMOVE': GatewayIntents.GUILD_MEMBERS,
+    'GUILD_AUDIT_LOG_ENTRY_CREATE': GatewayIntents.GUILD_MODERATION,
+    'GUILD_BAN_ADD': GatewayIntents.GUILD_MODERATION,
+    'GUILD_BAN_REMOVE': GatewayIntents.GUILD_MODERATION,
+    'GUILD_EMOJIS_UPDATE': GatewayIntents.GUILD_EMOJIS_AND_STICKERS,
+    'GUILD_STICKERS_UPDATE': GatewayIntents.GUILD_EMOJIS_AND_STICKERS,
+    'GUILD_INTEGRATIONS_UPDATE': GatewayIntents.GUILD_INTEGRATIONS,
+    'INTEGRATION_CREATE': GatewayIntents.GUILD_INTEGRATIONS,
+    'INTEGRATION_UPDATE': GatewayIntents.GUILD_INTEGRATIONS,
+    'INTEGRATION_DELETE': GatewayIntents.GUILD_INTEGRATIONS,
+    'WEBHOOKS_UPDATE': GatewayIntents.GUILD_WEBHOOKS,
+    'INVITE_CREATE': GatewayIntents.GUILD_INVITES,
+    'INVITE_DELETE': GatewayIntents.GUILD_INVITES,
+    'VOICE_STATE_UPDATE': GatewayIntents.GUILD_VOICE_STATES,
+    'PRESENCE_UPDATE': GatewayIntents.GUILD_PRESENCES,
+    'MESSAGE_CREATE': _GUILD_AND_DM_MESSAGES | GatewayIntents.MESSAGE_CONTENT,
+    'MESSAGE_UPDATE': _GUILD_AND_DM_MESSAGES | GatewayIntents.MESSAGE_CONTENT,
+    'MESSAGE_DELETE': _GUILD_AND_DM_MESSAGES,
+    'MESSAGE_DELETE_BULK': GatewayIntents.GUILD_MESSAGES,
+    'MESSAGE_REACTION_ADD': _REACTIONS,
+    'MESSAGE_REACTION_REMOVE': _REACTIONS,
+    'MESSAGE_REACTION_REMOVE_ALL': _REACTIONS,
+    'MESSAGE_REACTION_REMOVE_EMOJI': _REACTIONS,
+    'TYPING_START': GatewayIntents.GUILD_MESSAGE_TYPING | GatewayIntents.DIRECT_MESSAGE_TYPING,
+    'GUILD_SCHEDULED_EVENT_CREATE': GatewayIntents.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_UPDATE': GatewayIntents.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_DELETE': GatewayIntents.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_USER_ADD': GatewayIntents.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_USER_REMOVE': GatewayIntents.GUILD_SCHEDULED_EVENTS,
+    'AUTO_MODERATION_RULE_CREATE': GatewayIntents.AUTO_MODERATION_CONFIGURATION,
+    'AUTO_MODERATION_RULE_UPDATE': GatewayIntents.AUTO_MODERATION_CONFIGURATION,
+    'AUTO_MODERATION_RULE_DELETE': GatewayIntents.AUTO_MODERATION_CONFIGURATION,
+    'AUTO_MODERATION_ACTION_EXECUTION': GatewayIntents.AUTO_MODERATION_EXECUTION
+}
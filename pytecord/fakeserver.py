@@ -0,0 +1,650 @@
+"""
+Local stand-in of the discord REST API and gateway for load tests and
+benchmarks. It speaks enough of both to drive a `Client`:
+
+```
+>>> async with FakeDiscord(dispatch_rate=1000) as server:
+...     client = Client('token', api_url=server.api_url, gateway_url=server.gateway_url)
+```
+
+It can also be started from the command line:
+
+```command
+python -m pytecord.fakeserver --port 8080 --rate 5000
+```
+"""
+
+import json
+from argparse import ArgumentParser
+from asyncio import CancelledError, Event, Lock, Task, create_task
+from asyncio import run as arun
+from asyncio import sleep as asleep
+from collections import deque
+from datetime import datetime, timezone
+from time import monotonic, time
+from typing import Any, Awaitable, Callable
+from zlib import Z_SYNC_FLUSH, compressobj
+
+from aiohttp import WSMsgType, web
+
+from .codec import etf_dumps, etf_loads
+from .config import API_VERSION
+from .snowflake import DISCORD_EPOCH
+
+
+class GatewaySession:
+    """
+    Session of a gateway connection. Dispatched events are kept (at most
+    `history` of them), so the session can be resumed and missed events
+    replayed on a new connection.
+    """
+    def __init__(self, id: str, send: Callable[..., Awaitable[None]], history: int = 1000) -> None:
+        self.id = id
+        self.send = send
+        self.sequence = 0
+        self.events: deque[tuple[int, str, Any]] = deque(maxlen=history)
+        self.dispatcher: Task | None = None
+        self.guilds: list[dict[str, Any]] = []
+
+        # last sequence sent to the current connection, events are sent in
+        # order even while they are replayed
+        self.sent = 0
+        self.__lock = Lock()
+
+    async def dispatch(self, t: str, d: Any) -> None:
+        self.sequence += 1
+        s = self.sequence
+        self.events.append((s, t, d))
+        async with self.__lock:
+            if self.send is None or s <= self.sent:
+                return
+            try:
+                await self.send(0, d, t, s)
+                self.sent = s
+            except ConnectionError:
+                self.send = None
+
+    def can_replay(self, sequence: int) -> bool:
+        return not self.events or self.events[0][0] <= sequence + 1
+
+    async def resume(self, send: Callable[..., Awaitable[None]], sequence: int) -> None:
+        """
+        Send events after `sequence` to a new connection.
+        """
+        async with self.__lock:
+            self.send = send
+            self.sent = sequence
+            for s, t, d in list(self.events):
+                if s > sequence:
+                    await send(0, d, t, s)
+                    self.sent = s
+
+    def close(self) -> None:
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+
+
+class FakeDiscord:
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            *,
+            guilds: int = 1,
+            channels: int = 2,
+            members: int = 0,
+            dispatch_rate: float = 0.0,
+            dispatch_count: int | None = None,
+            heartbeat_interval: int = 41250,
+            rate_limit: int | None = 50,
+            rate_limit_reset: float = 1.0,
+            history: int = 1000,
+            fragment_size: int | None = None,
+            shards: int = 1,
+            max_concurrency: int = 1,
+            gateway_rate_limit: int | None = 120,
+            gateway_rate_reset: float = 60.0
+        ) -> None:
+        self.host = host
+        self.port = port
+
+        self.dispatch_rate = dispatch_rate
+        self.dispatch_count = dispatch_count
+        self.heartbeat_interval = heartbeat_interval
+        # turn off to simulate a zombie connection
+        self.ack_heartbeats = True
+        self.rate_limit = rate_limit
+        self.rate_limit_reset = rate_limit_reset
+        # with zlib-stream, split every compressed payload into websocket
+        # messages of this size
+        self.fragment_size = fragment_size
+        # recommended shard count and identify concurrency of /gateway/bot
+        self.shards = shards
+        self.max_concurrency = max_concurrency
+        # commands per connection, the connection is closed with 4008 when
+        # there are more
+        self.gateway_rate_limit = gateway_rate_limit
+        self.gateway_rate_reset = gateway_rate_reset
+
+        self.requests = 0
+        self.ratelimited = 0
+        self.identifies = 0
+        self.identify_log: list[tuple[int, float]] = []
+        self.resumes = 0
+        self.heartbeats = 0
+        self.last_heartbeat = None
+        self.commands_received = 0
+        self.presence_updates = 0
+        self.gateway_ratelimited = 0
+        self.dispatched = 0
+        self.dispatch_done = Event()
+
+        self._history = history
+        self._increment = 0
+        self._buckets: dict[str, list[float | int]] = {}
+        self._sockets: set[web.WebSocketResponse] = set()
+        self.sessions: dict[str, GatewaySession] = {}
+        self._runner: web.AppRunner | None = None
+
+        self.user = self.make_user('pytecord', bot=True)
+        self.users: dict[str, dict[str, Any]] = {self.user['id']: self.user}
+        self.guilds: dict[str, dict[str, Any]] = {}
+        self.channels: dict[str, dict[str, Any]] = {}
+        self.messages: dict[str, deque[dict[str, Any]]] = {}
+        self.members: dict[str, list[dict[str, Any]]] = {}
+        self.commands: list[dict[str, Any]] = []
+
+        for _ in range(guilds):
+            self.make_guild(channels, members)
+
+    @property
+    def api_url(self) -> str:
+        return f'http://{self.host}:{self.port}/api'
+
+    @property
+    def gateway_url(self) -> str:
+        return f'ws://{self.host}:{self.port}'
+
+    # Entities
+
+    def snowflake(self, timestamp: int = None) -> str:
+        self._increment = (self._increment + 1) & 0xFFF
+        timestamp = timestamp if timestamp is not None else int(time() * 1000)
+        return str(((timestamp - DISCORD_EPOCH) << 22) | self._increment)
+
+    def make_user(self, username: str, bot: bool = False) -> dict[str, Any]:
+        return {
+            'id': self.snowflake(),
+            'username': username,
+            'discriminator': '0',
+            'global_name': username,
+            'avatar': None,
+            'bot': bot
+        }
+
+    def make_guild(self, channels: int, members: int = 0) -> dict[str, Any]:
+        # every guild gets its own millisecond, so guilds are spread over shards
+        guild_id = self.snowflake(int(time() * 1000) - len(self.guilds))
+        guild = {
+            'id': guild_id,
+            'name': f'guild {len(self.guilds)}',
+            'icon': None,
+            'owner_id': self.user['id'],
+            'afk_timeout': 300,
+            'verification_level': 0,
+            'default_message_notifications': 0,
+            'explicit_content_filter': 0,
+            'features': [],
+            'mfa_level': 0,
+            'system_channel_flags': 0,
+            'premium_tier': 0,
+            'preferred_locale': 'en-US',
+            'nsfw_level': 0,
+            'roles': [{'id': guild_id, 'name': '@everyone', 'color': 0, 'position': 0, 'permissions': '0'}],
+            'channels': []
+        }
+        for i in range(channels):
+            channel = {'id': self.snowflake(), 'type': 0, 'name': f'channel-{i}', 'position': i, 'guild_id': guild_id}
+            guild['channels'].append(channel)
+            self.channels[channel['id']] = channel
+            self.messages[channel['id']] = deque(maxlen=self._history)
+        # members aren't in GUILD_CREATE, like in large guilds
+        self.members[guild_id] = [
+            {'user': self.make_user(f'user-{i}'), 'nick': None, 'roles': [], 'joined_at': datetime.now(timezone.utc).isoformat(), 'deaf': False, 'mute': False, 'flags': 0}
+            for i in range(members)
+        ]
+        self.guilds[guild_id] = guild
+        return guild
+
+    def find_members(self, guild_id: str, query: str = '', limit: int = 0, user_ids: list[str] = None) -> list[dict[str, Any]]:
+        members = self.members.get(guild_id, [])
+        if user_ids is not None:
+            ids = {str(i) for i in user_ids}
+            result = [i for i in members if i['user']['id'] in ids]
+        else:
+            result = [i for i in members if i['user']['username'].startswith(query)]
+        return result[:limit] if limit else result
+
+    def make_message(self, channel_id: str, content: str, author: dict[str, Any] = None, **fields) -> dict[str, Any]:
+        channel = self.channels[channel_id]
+        message = {
+            'id': self.snowflake(),
+            'channel_id': channel_id,
+            'guild_id': channel.get('guild_id'),
+            'author': author or self.user,
+            'content': content,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'pinned': False,
+            'type': 0
+        }
+        message.update(fields)
+        self.messages[channel_id].append(message)
+        return message
+
+    # REST
+
+    def ratelimit_headers(self, request: web.Request) -> tuple[dict[str, str], float]:
+        """
+        Count the request in its bucket. Returns rate limit headers and how
+        many seconds the request must wait (`0` if it isn't limited).
+        """
+        major = request.match_info.get('channel_id') or request.match_info.get('guild_id') or ''
+        key = f'{request.method} {request.match_info.route.resource.canonical}:{major}'
+        now = monotonic()
+
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket[0] <= now:
+            bucket = self._buckets[key] = [now + self.rate_limit_reset, 0]
+        bucket[1] += 1
+
+        remaining = max(self.rate_limit - bucket[1], 0)
+        reset_after = bucket[0] - now
+        headers = {
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+            'X-RateLimit-Bucket': str(abs(hash(request.match_info.route.resource.canonical)))
+        }
+        return headers, reset_after if bucket[1] > self.rate_limit else 0.0
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.path == '/' or request.match_info.route.resource is None:
+            return await handler(request)
+        self.requests += 1
+
+        if self.rate_limit is None:
+            return await handler(request)
+
+        headers, retry_after = self.ratelimit_headers(request)
+        if retry_after:
+            self.ratelimited += 1
+            return web.json_response(
+                {'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': False},
+                status=429, headers=headers
+            )
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _get(self, mapping: dict[str, Any], key: str) -> web.Response:
+        if (data := mapping.get(key)) is None:
+            return web.json_response({'message': 'Unknown', 'code': 10000}, status=404)
+        return web.json_response(data)
+
+    async def get_gateway(self, request: web.Request) -> web.Response:
+        return web.json_response({'url': self.gateway_url})
+
+    async def get_gateway_bot(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'url': self.gateway_url,
+            'shards': self.shards,
+            'session_start_limit': {
+                'total': 1000,
+                'remaining': 1000,
+                'reset_after': 0,
+                'max_concurrency': self.max_concurrency
+            }
+        })
+
+    async def get_current_user(self, request: web.Request) -> web.Response:
+        return web.json_response(self.user)
+
+    async def get_user(self, request: web.Request) -> web.Response:
+        return self._get(self.users, request.match_info['user_id'])
+
+    async def get_current_user_guilds(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get('limit', 200))
+        after = int(request.query.get('after', 0))
+        guilds = sorted((i for i in self.guilds.values() if int(i['id']) > after), key=lambda i: int(i['id']))
+        return web.json_response([{'id': i['id'], 'name': i['name'], 'icon': None} for i in guilds[:limit]])
+
+    async def get_guild(self, request: web.Request) -> web.Response:
+        return self._get(self.guilds, request.match_info['guild_id'])
+
+    async def get_guild_channels(self, request: web.Request) -> web.Response:
+        if (guild := self.guilds.get(request.match_info['guild_id'])) is None:
+            return self._get({}, '')
+        return web.json_response(guild['channels'])
+
+    async def search_guild_members(self, request: web.Request) -> web.Response:
+        if request.match_info['guild_id'] not in self.guilds:
+            return self._get({}, '')
+        limit = min(int(request.query.get('limit', 1)), 1000)
+        return web.json_response(self.find_members(request.match_info['guild_id'], request.query.get('query', ''), limit))
+
+    async def get_guild_roles(self, request: web.Request) -> web.Response:
+        if (guild := self.guilds.get(request.match_info['guild_id'])) is None:
+            return self._get({}, '')
+        return web.json_response(guild['roles'])
+
+    async def get_channel(self, request: web.Request) -> web.Response:
+        return self._get(self.channels, request.match_info['channel_id'])
+
+    async def get_messages(self, request: web.Request) -> web.Response:
+        if (messages := self.messages.get(request.match_info['channel_id'])) is None:
+            return self._get({}, '')
+        limit = min(int(request.query.get('limit', 50)), 100)
+        before = int(request.query.get('before', 0))
+        after = int(request.query.get('after', 0))
+
+        if around := int(request.query.get('around', 0)):
+            index = next((i for i, message in enumerate(messages) if int(message['id']) >= around), len(messages))
+            start = max(index - limit // 2, 0)
+            return web.json_response(list(reversed(list(messages)[start:start + limit])))
+
+        result = [i for i in reversed(messages) if (not before or int(i['id']) < before) and int(i['id']) > after]
+        if after and not before:
+            result = result[-limit:]
+        return web.json_response(result[:limit])
+
+    async def get_message(self, request: web.Request) -> web.Response:
+        messages = self.messages.get(request.match_info['channel_id'], ())
+        return self._get({i['id']: i for i in messages}, request.match_info['message_id'])
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info['channel_id']
+        if channel_id not in self.channels:
+            return self._get({}, '')
+        data = await request.json()
+        return web.json_response(self.make_message(channel_id, data.get('content', ''), **{
+            k: v for k, v in data.items() if k in ('message_reference', 'flags', 'nonce')
+        }))
+
+    async def get_commands(self, request: web.Request) -> web.Response:
+        return web.json_response(self.commands)
+
+    async def put_commands(self, request: web.Request) -> web.Response:
+        application_id = request.match_info['application_id']
+        # like discord, USER and MESSAGE commands have no description
+        self.commands = [
+            dict(i, id=self.snowflake(), application_id=application_id, version=self.snowflake(),
+                 **({'description': ''} if i.get('type') in (2, 3) else {}))
+            for i in await request.json()
+        ]
+        return web.json_response(self.commands)
+
+    async def interaction_callback(self, request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    # Gateway
+
+    async def gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+
+        session = None
+        lock = Lock()
+        deflator = compressobj() if request.query.get('compress') == 'zlib-stream' else None
+        etf = request.query.get('encoding') == 'etf'
+        commands: deque[float] = deque()
+
+        async def send(op: int, d: Any = None, t: str = None, s: int = None):
+            payload = {'op': op, 'd': d, 's': s, 't': t}
+            payload = etf_dumps(payload) if etf else json.dumps(payload).encode()
+
+            async with lock:
+                if deflator is None:
+                    if etf:
+                        await ws.send_bytes(payload)
+                    else:
+                        await ws.send_str(payload.decode())
+                    return
+                compressed = deflator.compress(payload) + deflator.flush(Z_SYNC_FLUSH)
+                size = self.fragment_size or len(compressed)
+                for i in range(0, len(compressed), size):
+                    await ws.send_bytes(compressed[i:i + size])
+
+        try:
+            await send(10, {'heartbeat_interval': self.heartbeat_interval})
+
+            async for message in ws:
+                if message.type == WSMsgType.TEXT:
+                    payload = json.loads(message.data)
+                elif message.type == WSMsgType.BINARY:
+                    payload = etf_loads(message.data)
+                else:
+                    continue
+
+                self.commands_received += 1
+                if self.gateway_rate_limit is not None:
+                    now = monotonic()
+                    commands.append(now)
+                    while commands[0] <= now - self.gateway_rate_reset:
+                        commands.popleft()
+                    if len(commands) > self.gateway_rate_limit:
+                        self.gateway_ratelimited += 1
+                        await ws.close(code=4008, message=b'Rate limited.')
+                        break
+
+                match payload['op']:
+                    case 1:
+                        self.heartbeats += 1
+                        self.last_heartbeat = payload['d']
+                        if self.ack_heartbeats:
+                            await send(11)
+                    case 2:
+                        self.identifies += 1
+                        shard = payload['d'].get('shard') or [0, 1]
+                        self.identify_log.append((shard[0], monotonic()))
+
+                        session = GatewaySession(self.snowflake(), send, self._history)
+                        session.guilds = [i for i in self.guilds.values() if (int(i['id']) >> 22) % shard[1] == shard[0]]
+                        self.sessions[session.id] = session
+                        await session.dispatch('READY', {
+                            'v': API_VERSION,
+                            'user': self.user,
+                            'guilds': [{'id': i['id'], 'unavailable': True} for i in session.guilds],
+                            'session_id': session.id,
+                            'resume_gateway_url': self.gateway_url,
+                            'shard': shard,
+                            'application': {'id': self.user['id'], 'flags': 0}
+                        })
+                        for guild in session.guilds:
+                            await session.dispatch('GUILD_CREATE', guild)
+                        if self.dispatch_rate:
+                            session.dispatcher = create_task(self.dispatch_messages(session))
+                    case 6:
+                        session = self.sessions.get(payload['d']['session_id'])
+                        if session is None or not session.can_replay(payload['d']['seq']):
+                            await send(9, False)
+                            continue
+                        self.resumes += 1
+                        await session.resume(send, payload['d']['seq'])
+                        await session.dispatch('RESUMED', {})
+                    case 3:
+                        self.presence_updates += 1
+                    case 8: # REQUEST_GUILD_MEMBERS, sent in chunks of 1000 members
+                        if session is None:
+                            continue
+                        d = payload['d']
+                        members = self.find_members(str(d['guild_id']), d.get('query', ''), d.get('limit', 0), d.get('user_ids'))
+                        chunks = [members[i:i + 1000] for i in range(0, len(members), 1000)] or [[]]
+                        for index, chunk in enumerate(chunks):
+                            await session.dispatch('GUILD_MEMBERS_CHUNK', {
+                                'guild_id': str(d['guild_id']),
+                                'members': chunk,
+                                'chunk_index': index,
+                                'chunk_count': len(chunks),
+                                'nonce': d.get('nonce')
+                            })
+        except CancelledError:
+            pass
+        finally:
+            if session is not None and session.send is send:
+                session.send = None
+            self._sockets.discard(ws)
+        return ws
+
+    async def dispatch_messages(self, session: 'GatewaySession') -> None:
+        """
+        Dispatch MESSAGE_CREATE events from users at `dispatch_rate` events
+        per second (and at most `dispatch_count` events) to the channels of
+        the guilds of the session. Every message has the time it was sent (`time.time()`)
+        as its nonce, so clients can measure latency. Events dispatched while
+        the client is disconnected are replayed when it resumes.
+        """
+        author = self.make_user('user')
+        channels = [i['id'] for guild in session.guilds for i in guild['channels']]
+        if not channels:
+            return
+        tick = 0.01
+        start = monotonic()
+        sent = 0
+
+        while self.dispatch_count is None or sent < self.dispatch_count:
+            due = int((monotonic() - start) * self.dispatch_rate) + 1
+            if self.dispatch_count is not None:
+                due = min(due, self.dispatch_count)
+
+            while sent < due:
+                message = self.make_message(channels[sent % len(channels)], f'message {sent}', author, nonce=str(time()))
+                await session.dispatch('MESSAGE_CREATE', message)
+                sent += 1
+                self.dispatched += 1
+            await asleep(tick)
+        self.dispatch_done.set()
+
+    async def disconnect(self, code: int = 1006) -> None:
+        """
+        Close all gateway connections. Sessions are kept, so clients can
+        resume them.
+        """
+        for ws in list(self._sockets):
+            await ws.close(code=code)
+
+    async def request_heartbeat(self) -> None:
+        """
+        Send op 1 HEARTBEAT to all gateway connections.
+        """
+        for session in list(self.sessions.values()):
+            if session.send is not None:
+                await session.send(1)
+
+    async def request_reconnect(self) -> None:
+        """
+        Send op 7 RECONNECT to all gateway connections.
+        """
+        for session in list(self.sessions.values()):
+            if session.send is not None:
+                await session.send(7)
+
+    async def invalidate_sessions(self, resumable: bool = False) -> None:
+        """
+        Send op 9 INVALID_SESSION to all gateway connections. Sessions that
+        are not `resumable` are dropped.
+        """
+        for session in list(self.sessions.values()):
+            if session.send is not None:
+                await session.send(9, resumable)
+            if not resumable:
+                session.close()
+                self.sessions.pop(session.id, None)
+
+    # Server
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        api = f'/api/v{API_VERSION}'
+        app.router.add_get('/', self.gateway)
+        app.router.add_get(f'{api}/gateway', self.get_gateway)
+        app.router.add_get(f'{api}/gateway/bot', self.get_gateway_bot)
+        app.router.add_get(f'{api}/users/@me', self.get_current_user)
+        app.router.add_get(f'{api}/users/@me/guilds', self.get_current_user_guilds)
+        app.router.add_get(f'{api}/users/{{user_id}}', self.get_user)
+        app.router.add_get(f'{api}/guilds/{{guild_id}}', self.get_guild)
+        app.router.add_get(f'{api}/guilds/{{guild_id}}/channels', self.get_guild_channels)
+        app.router.add_get(f'{api}/guilds/{{guild_id}}/roles', self.get_guild_roles)
+        app.router.add_get(f'{api}/guilds/{{guild_id}}/members/search', self.search_guild_members)
+        app.router.add_get(f'{api}/channels/{{channel_id}}', self.get_channel)
+        app.router.add_get(f'{api}/channels/{{channel_id}}/messages', self.get_messages)
+        app.router.add_post(f'{api}/channels/{{channel_id}}/messages', self.create_message)
+        app.router.add_get(f'{api}/channels/{{channel_id}}/messages/{{message_id}}', self.get_message)
+        app.router.add_get(f'{api}/applications/{{application_id}}/commands', self.get_commands)
+        app.router.add_put(f'{api}/applications/{{application_id}}/commands', self.put_commands)
+        app.router.add_post(f'{api}/interactions/{{interaction_id}}/{{token}}/callback', self.interaction_callback)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'FakeDiscord':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+
+def main():
+    parser = ArgumentParser(description='Local stand-in of the discord REST API and gateway')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--guilds', type=int, default=1)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--rate', type=float, default=0.0, help='MESSAGE_CREATE events per second')
+    parser.add_argument('--rate-limit', type=int, default=50, help='requests per bucket per second')
+    parser.add_argument('--shards', type=int, default=1, help='recommended shard count')
+    parser.add_argument('--max-concurrency', type=int, default=1)
+    args = parser.parse_args()
+
+    async def serve():
+        server = FakeDiscord(
+            args.host, args.port, guilds=args.guilds, channels=args.channels,
+            dispatch_rate=args.rate, rate_limit=args.rate_limit,
+            shards=args.shards, max_concurrency=args.max_concurrency
+        )
+        await server.start()
+        print(f'REST: {server.api_url}\nGateway: {server.gateway_url}')
+        await Event().wait()
+
+    try:
+        arun(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
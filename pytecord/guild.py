@@ -1,12 +1,16 @@
-from typing import Any, Literal
+from asyncio import Task, create_task
+from typing import Any, AsyncIterator, Literal
 
 from .interfaces import Object
-from .user import User, GuildMember, ThreadMember
+from .model import Field, Model
+from .user import User, GuildMember, ThreadMember, get_member, get_user
 from .role import Role
 from .reaction import DefaultReaction, Emoji, Sticker
-from .utils import MessagePayload, get_snowflake, get_list_of_types, apost, rget
+from .utils import DiscordException, MessagePayload, get_snowflake, get_list_of_types, aget, apost, rget, cached_rget
 from .annotations import hash_str, permissions_set
+from .snowflake import Snowflake, snowflake_time
 from .timestamp import Timestamp
+from .state import get_state
 
 class WelcomeScreenChannel:
     def __init__(self, data: dict[str, Any], token: str) -> None:
@@ -19,7 +23,13 @@ class WelcomeScreenChannel:
     
     @property
     def channel(self) -> 'GuildChannel':
-        data = rget(f'/channels/{self.__channel_id}', self.__token).json()
+        if (data := get_state(self.__token).get_channel(self.__channel_id)) is None:
+            data = cached_rget(f'/channels/{self.__channel_id}', self.__token, 'channel')
+        return GuildChannel(data, self.__token)
+
+    async def fetch_channel(self, *, fresh: bool = False) -> 'GuildChannel':
+        if fresh or (data := get_state(self.__token).get_channel(self.__channel_id)) is None:
+            data = await aget(f'/channels/{self.__channel_id}', self.__token, cache='channel', fresh=fresh)
         return GuildChannel(data, self.__token)
 
 class WelcomeScreen:
@@ -151,81 +161,83 @@ class Widget:
         self.presence_count: int = data.get('presence_count')
 
 
-class Guild(Object):
-    def __init__(self, data: dict[str, Any], token: str):
-        self.id: int = get_snowflake(data.get('id'))
-        self.name: str = data.get('name')
-        self.icon: hash_str | None = data.get('icon')
-        self.icon_hash: hash_str | None = data.get('icon_hash')
-        self.splash: hash_str | None = data.get('splash')
-        self.discovery_splash: hash_str | None = data.get('discovery_splash')
-        self.is_owner: bool | None = data.get('owner')
-        self.permissions: str | None = data.get('permissions')
-        self.region: str | None = data.get('region') # deprecated
-        self.afk_channel_id: int | None = get_snowflake(data.get('afk_channel_id'))
-        self.afk_timeout: int = data.get('afk_timeout')
-        self.widget_enabled: bool | None = data.get('widget_enabled')
-        self.widget_channel_id: int | None = get_snowflake(x := data.get('widget_channel_id'))
-        self.verification_level: VerificationLevel = VerificationLevel(data.get('verification_level'))
-        self.default_message_notifications: DefaultMessageNotificationLevel = DefaultMessageNotificationLevel(data.get('default_message_notifications'))
-        self.explicit_content_filter: ExplicitContentFilterLevel = ExplicitContentFilterLevel(data.get('explicit_content_filter'))
-        self.features: list[str] = data.get('features')
-        self.mfa_enabled: bool = data.get('mfa_level') == 1
-        self.application_id: int | None = get_snowflake(data.get('application_id'))
-        self.system_channel_id: int | None = get_snowflake(data.get('system_channel_id'))
-        self.system_channel_flags: int = data.get('system_channel_flags')
-        self.rules_channel_id: int | None = get_snowflake(data.get('rules_channel_id'))
-        self.max_presences: int | None = data.get('max_presences')
-        self.max_members: int | None = data.get('max_members')
-        self.vanity_url_code: str | None = data.get('vanity_url_code')
-        self.description: str | None = data.get('description')
-        self.banner: hash_str | None = data.get('banner')
-        self.premium_tier:  int = data.get('premium_tier')
-        self.premium_subscription_count: int | None = data.get('premium_subscription_count')
-        self.preferred_locale: str = data.get('preferred_locale')
-        self.public_updates_channel_id: int | None = int(data.get('public_updates_channel_id'))
-        self.max_video_channel_users: int | None = data.get('max_video_channel_users')
-        self.max_stage_video_channel_users: int | None = data.get('max_stage_video_channel_users')
-        self.approximate_member_count: int | None = data.get('approximate_member_count')
-        self.approximate_presence_count: int | None = data.get('approximate_presence_count')
-        self.nsfw_level: NSFWLevel = NSFWLevel(data.get('nsfw_level'))
-        self.premium_progress_bar_enabled: bool = data.get('premium_progress_bar_enabled')
-        self.safety_alerts_channel_id: int | None = get_snowflake(data.get('safety_alerts_channel_id'))
-
-        self.__owner_id = data.get('owner_id')
-        self.__token = token
-        self.__data = data
+class Guild(Model):
+    __slots__ = ()
+
+    id: int = Field(convert=get_snowflake)
+    created_at: Timestamp = Field('id', snowflake_time)
+    name: str = Field()
+    icon: hash_str | None = Field()
+    icon_hash: hash_str | None = Field()
+    splash: hash_str | None = Field()
+    discovery_splash: hash_str | None = Field()
+    is_owner: bool | None = Field('owner')
+    permissions: str | None = Field()
+    region: str | None = Field() # deprecated
+    afk_channel_id: int | None = Field(convert=get_snowflake)
+    afk_timeout: int = Field()
+    widget_enabled: bool | None = Field()
+    widget_channel_id: int | None = Field(convert=get_snowflake)
+    verification_level: VerificationLevel = Field(convert=VerificationLevel)
+    default_message_notifications: DefaultMessageNotificationLevel = Field(convert=DefaultMessageNotificationLevel)
+    explicit_content_filter: ExplicitContentFilterLevel = Field(convert=ExplicitContentFilterLevel)
+    features: list[str] = Field()
+    mfa_enabled: bool = Field('mfa_level', lambda x: x == 1)
+    application_id: int | None = Field(convert=get_snowflake)
+    system_channel_id: int | None = Field(convert=get_snowflake)
+    system_channel_flags: int = Field()
+    rules_channel_id: int | None = Field(convert=get_snowflake)
+    max_presences: int | None = Field()
+    max_members: int | None = Field()
+    vanity_url_code: str | None = Field()
+    description: str | None = Field()
+    banner: hash_str | None = Field()
+    premium_tier: int = Field()
+    premium_subscription_count: int | None = Field()
+    preferred_locale: str = Field()
+    public_updates_channel_id: int | None = Field(convert=get_snowflake)
+    max_video_channel_users: int | None = Field()
+    max_stage_video_channel_users: int | None = Field()
+    approximate_member_count: int | None = Field()
+    approximate_presence_count: int | None = Field()
+    nsfw_level: NSFWLevel = Field(convert=NSFWLevel)
+    premium_progress_bar_enabled: bool = Field()
+    safety_alerts_channel_id: int | None = Field(convert=get_snowflake)
+
+    __owner_id = Field('owner_id')
     
     @property
     def owner(self) -> User:
         """
         This property returns the user object of the guild owner.
         """
-        data = rget(f'/users/{self.__owner_id}', self.__token).json()
-        return User(data, self.__token)
+        data = cached_rget(f'/users/{self.__owner_id}', self._token, 'user')
+        return User(data, self._token)
 
     @property
     def channels(self) -> 'list[GuildChannel]':
         """
         This property returns a list of all guild channels.
         """
-        data = rget(f'/guilds/{self.id}/channels', self.__token).json()
-        return get_list_of_types(GuildChannel, data, self.__token)
+        if (data := get_state(self._token).get_guild_channels(self.id)) is None:
+            data = rget(f'/guilds/{self.id}/channels', self._token).json()
+        return get_list_of_types(GuildChannel, data, self._token)
 
     @property
     def emojis(self) -> list[Emoji]:
         """
         This property returns a list of all emojis in the guild.
         """
-        data = rget(f'/guilds/{self.id}/emojis', self.__token).json()
-        return get_list_of_types(Emoji, data, self.__token)
+        data = rget(f'/guilds/{self.id}/emojis', self._token).json()
+        return get_list_of_types(Emoji, data, self._token)
 
     @property
     def roles(self) -> list[Role]:
         """
         This property returns a list of all roles in the guild.
         """
-        data = rget(f'/guilds/{self.id}/roles', self.__token).json()
+        if (data := get_state(self._token).get_guild_roles(self.id)) is None:
+            data = rget(f'/guilds/{self.id}/roles', self._token).json()
         return get_list_of_types(Role, data)
 
     @property
@@ -233,8 +245,8 @@ class Guild(Object):
         """
         This property returns a list of all stickers in the guild.
         """
-        data = rget(f'/guilds/{self.id}/stickers', self.__token).json()
-        return get_list_of_types(Sticker, data, self.__token)
+        data = rget(f'/guilds/{self.id}/stickers', self._token).json()
+        return get_list_of_types(Sticker, data, self._token)
 
     @property
     def welcome_screen(self) -> WelcomeScreen | None:
@@ -242,26 +254,26 @@ class Guild(Object):
         This property returns the welcome screen configuration for the guild, if available.
         """
         try:
-            data = rget(f'/guilds/{self.id}/welcome-screen', self.__token)
+            data = rget(f'/guilds/{self.id}/welcome-screen', self._token).json()
         except:
             return
-        return WelcomeScreen(data, self.__token)
+        return WelcomeScreen(data, self._token)
 
     @property
     def preview(self) -> GuildPreview:
         """
         This property returns a preview object for the guild, providing some basic information.
         """
-        data = rget(f'/guilds/{self.id}/preview', self.__token).json()
-        return GuildPreview(data, self.__token)
+        data = rget(f'/guilds/{self.id}/preview', self._token).json()
+        return GuildPreview(data, self._token)
     
     @property
     def onboarding(self) -> GuildOnboarding:
         """
         This property returns the onboarding configuration for the guild, if available.
         """
-        data = rget(f'/guilds/{self.id}/onboarding', self.__token).json()
-        return GuildOnboarding(data, self.__token)
+        data = rget(f'/guilds/{self.id}/onboarding', self._token).json()
+        return GuildOnboarding(data, self._token)
     
     @property
     def widget(self) -> Widget | None:
@@ -269,10 +281,10 @@ class Guild(Object):
         This property returns the widget configuration for the guild, if available.
         """
         try:
-            data = rget(f'/guilds/{self.id}/widget.json', self.__token).json()
+            data = rget(f'/guilds/{self.id}/widget.json', self._token).json()
         except:
             return
-        return Widget(data, self.__token)
+        return Widget(data, self._token)
     
     @property
     def member(self) -> GuildMember | None:
@@ -280,11 +292,61 @@ class Guild(Object):
         This property returns the guild member object for bot, if bot is in guild.
         """
         try:
-            data = rget(f'/users/@me/guilds/{self.id}/member', self.__token)
+            data = rget(f'/users/@me/guilds/{self.id}/member', self._token).json()
         except:
             return
-        return GuildMember(data, self.__token)
-        
+        return get_member(data, self._token, self.id)
+
+    async def fetch_owner(self, *, fresh: bool = False) -> User:
+        data = await aget(f'/users/{self.__owner_id}', self._token, cache='user', fresh=fresh)
+        return User(data, self._token)
+
+    async def fetch_channels(self, *, fresh: bool = False) -> 'list[GuildChannel]':
+        if fresh or (data := get_state(self._token).get_guild_channels(self.id)) is None:
+            data = await aget(f'/guilds/{self.id}/channels', self._token)
+        return get_list_of_types(GuildChannel, data, self._token)
+
+    async def fetch_emojis(self) -> list[Emoji]:
+        data = await aget(f'/guilds/{self.id}/emojis', self._token)
+        return get_list_of_types(Emoji, data, self._token)
+
+    async def fetch_roles(self, *, fresh: bool = False) -> list[Role]:
+        if fresh or (data := get_state(self._token).get_guild_roles(self.id)) is None:
+            data = await aget(f'/guilds/{self.id}/roles', self._token)
+        return get_list_of_types(Role, data)
+
+    async def fetch_stickers(self) -> list[Sticker]:
+        data = await aget(f'/guilds/{self.id}/stickers', self._token)
+        return get_list_of_types(Sticker, data, self._token)
+
+    async def fetch_welcome_screen(self) -> WelcomeScreen | None:
+        try:
+            data = await aget(f'/guilds/{self.id}/welcome-screen', self._token)
+        except DiscordException:
+            return
+        return WelcomeScreen(data, self._token)
+
+    async def fetch_preview(self) -> GuildPreview:
+        data = await aget(f'/guilds/{self.id}/preview', self._token)
+        return GuildPreview(data, self._token)
+
+    async def fetch_onboarding(self) -> GuildOnboarding:
+        data = await aget(f'/guilds/{self.id}/onboarding', self._token)
+        return GuildOnboarding(data, self._token)
+
+    async def fetch_widget(self) -> Widget | None:
+        try:
+            data = await aget(f'/guilds/{self.id}/widget.json', self._token)
+        except DiscordException:
+            return
+        return Widget(data, self._token)
+
+    async def fetch_member(self) -> GuildMember | None:
+        try:
+            data = await aget(f'/users/@me/guilds/{self.id}/member', self._token)
+        except DiscordException:
+            return
+        return get_member(data, self._token, self.id)
 
     def __int__(self) -> int:
         return self.id
@@ -292,9 +354,6 @@ class Guild(Object):
     def __str__(self) -> str:
         return self.name
     
-    def eval(self) -> dict[str, Any]:
-        return self.__data
-    
     def search(self, query: str, limit: int = 1) -> list[GuildMember] | GuildMember | None:
         """
         The search function is a method that allows you to search for guild members on a Discord server. It takes a query string as input, which is used to search for members whose username or nickname starts with the provided string. The limit parameter limits the maximum number of search results (by default, it's set to 1).
@@ -305,13 +364,30 @@ class Guild(Object):
 
         Link: https://discord.com/developers/docs/resources/guild#search-guild-members
         """
-        payload = {
+        params = {
+            'query': query,
+            'limit': limit
+        }
+        data = rget(f'/guilds/{self.id}/members/search', self._token, params=params).json()
+
+        result = get_list_of_types(get_member, data, self._token, self.id) or []
+        if limit == 1 and len(result) == 1:
+            result = result[0]
+        elif len(result) == 0:
+            result = None
+        return result
+
+    async def search_members(self, query: str, limit: int = 1) -> list[GuildMember] | GuildMember | None:
+        """
+        Async version of `search`.
+        """
+        params = {
             'query': query,
             'limit': limit
         }
-        data = rget(f'/guilds/{self.id}/members/search', self.__token, payload)
+        data = await aget(f'/guilds/{self.id}/members/search', self._token, params=params)
 
-        result = get_list_of_types(GuildMember, data, self.__token, __default=[])
+        result = get_list_of_types(get_member, data, self._token, self.id) or []
         if limit == 1 and len(result) == 1:
             result = result[0]
         elif len(result) == 0:
@@ -349,54 +425,64 @@ class Tag:
         self.emoji_name: str | None = data.get('emoji_name')
 
 
-class GuildChannel(Object):
-    def __init__(self, data: dict[str, Any], token: str):
-        self.id: int = get_snowflake(data.get('id'))
-        self.type: int = data.get('type')
-        self.position: int | None = data.get('position')
-        self.permission_overwrites: list[Overwrite] = get_list_of_types(Overwrite, data.get('permission_overwrites', []))
-        self.name: str | None = data.get('name')
-        self.topic: str | None = data.get('topic')
-        self.nsfw: bool | None = data.get('nsfw')
-        self.last_message_id: int | None = get_snowflake(data.get('last_message_id'))
-        self.bitrate: int | None = data.get('bitrate')
-        self.user_limit: int | None = data.get('user_limit')
-        self.rate_limit_per_user: int | None = data.get('rate_limit_per_user')
-        self.recipients: list[User] | None = get_list_of_types(User, data.get('recipients'), token)
-        self.icon: hash_str | None = data.get('icon')
-        self.owner_id: int | None = get_snowflake(data.get('owner_id'))
-        self.application_id: int | None = get_snowflake(data.get('application_id'))
-        self.managed: bool | None = data.get('managed')
-        self.parent_id: int | None = get_snowflake(data.get('parent_id'))
-        self.last_pin_timestamp: Timestamp = Timestamp.from_iso(data.get('last_pin_timestamp'))
-        self.rtc_region: str | None = data.get('rtc_region')
-        self.video_quality_mode: int | None = data.get('video_quality_mode')
-        self.message_count: int | None = data.get('message_count')
-        self.member_count: int | None = data.get('member_count')
-        self.thread_metadata: ThreadMetadata | None = ThreadMetadata(x) if (x := data.get('thread_metadata')) else None
-        self.member: ThreadMember | None = ThreadMember(x, token) if (x := data.get('member')) else None
-        self.default_auto_archive_duration: int | None = data.get('default_auto_archive_duration')
-        self.permissions: permissions_set | None = data.get('permissions')
-        self.flags: int | None = data.get('flags')
-        self.total_message_sent: int | None = data.get('total_message_sent')
-        self.available_tags: list[Tag] | None = get_list_of_types(Tag, data.get('available_tags'))
-        self.applied_tags: list[int] | None = get_list_of_types(int, data.get('applied_tags'))
-        self.default_reaction_emoji: DefaultReaction | None = DefaultReaction(x) if (x := data.get('default_reaction_emoji')) else None
-        self.default_thread_rate_limit_per_user: int | None = data.get('default_thread_rate_limit_per_user')
-        self.default_sort_order: int | None = data.get('default_sort_order')
-
-        x = data.get('default_forum_layout')
-        self.default_forum_layout: Literal['none', 'list', 'gallery'] | None = 'none' if x == 0 else 'list' if x == 1 else 'gallery' if x == 2 else None
-
-        self.__guild_id = get_snowflake(data.get('guild_id'))
-        self.__token = token
-        self.__data = data
+def _forum_layout(x: int | None) -> Literal['none', 'list', 'gallery'] | None:
+    return 'none' if x == 0 else 'list' if x == 1 else 'gallery' if x == 2 else None
+
+
+class GuildChannel(Model):
+    __slots__ = ()
+
+    id: int = Field(convert=get_snowflake)
+    created_at: Timestamp = Field('id', snowflake_time)
+    type: int = Field()
+    position: int | None = Field()
+    permission_overwrites: list[Overwrite] = Field(convert=lambda x: get_list_of_types(Overwrite, x or []))
+    name: str | None = Field()
+    topic: str | None = Field()
+    nsfw: bool | None = Field()
+    last_message_id: int | None = Field(convert=get_snowflake)
+    bitrate: int | None = Field()
+    user_limit: int | None = Field()
+    rate_limit_per_user: int | None = Field()
+    recipients: list[User] | None = Field(model=get_user, many=True)
+    icon: hash_str | None = Field()
+    owner_id: int | None = Field(convert=get_snowflake)
+    application_id: int | None = Field(convert=get_snowflake)
+    managed: bool | None = Field()
+    parent_id: int | None = Field(convert=get_snowflake)
+    last_pin_timestamp: Timestamp = Field(convert=Timestamp.from_iso)
+    rtc_region: str | None = Field()
+    video_quality_mode: int | None = Field()
+    message_count: int | None = Field()
+    member_count: int | None = Field()
+    thread_metadata: ThreadMetadata | None = Field(convert=lambda x: ThreadMetadata(x) if x else None)
+    member: ThreadMember | None = Field(model=ThreadMember)
+    default_auto_archive_duration: int | None = Field()
+    permissions: permissions_set | None = Field()
+    flags: int | None = Field()
+    total_message_sent: int | None = Field()
+    available_tags: list[Tag] | None = Field(convert=lambda x: get_list_of_types(Tag, x))
+    applied_tags: list[int] | None = Field(convert=lambda x: get_list_of_types(int, x))
+    default_reaction_emoji: DefaultReaction | None = Field(convert=lambda x: DefaultReaction(x) if x else None)
+    default_thread_rate_limit_per_user: int | None = Field()
+    default_sort_order: int | None = Field()
+    default_forum_layout: Literal['none', 'list', 'gallery'] | None = Field(convert=_forum_layout)
+
+    __guild_id = Field('guild_id', get_snowflake)
     
     @property
     def guild(self) -> Guild | None:
         if self.__guild_id:
-            data = rget(f'/guilds/{self.__guild_id}', self.__token).json()
-            return Guild(data, self.__token)
+            if (data := get_state(self._token).get_guild(self.__guild_id)) is None:
+                data = cached_rget(f'/guilds/{self.__guild_id}', self._token, 'guild')
+            return Guild(data, self._token)
+        return None
+
+    async def fetch_guild(self, *, fresh: bool = False) -> Guild | None:
+        if self.__guild_id:
+            if fresh or (data := get_state(self._token).get_guild(self.__guild_id)) is None:
+                data = await aget(f'/guilds/{self.__guild_id}', self._token, cache='guild', fresh=fresh)
+            return Guild(data, self._token)
         return None
     
     def __int__(self) -> int:
@@ -408,9 +494,6 @@ class GuildChannel(Object):
     def __getitem__(self, key: int):
         return self.fetch(key)
     
-    def eval(self) -> dict[str, Any]:
-        return self.__data
-    
     def fetch(self, id: int) -> 'Message':
         """
         Fetch a message
@@ -420,63 +503,154 @@ class GuildChannel(Object):
         >>> message = channel.fetch(955886808095399996)
         ```
         """
-        data = rget(f'/channels/{self.id}/messages/{id}', self.__token).json()
-        return Message(data, self.__token)
+        data = rget(f'/channels/{self.id}/messages/{id}', self._token).json()
+        return Message(data, self._token)
+
+    async def fetch_message(self, id: int) -> 'Message':
+        """
+        Fetch a message without blocking the event loop
+
+        ```
+        >>> channel = GuildChannel()
+        >>> message = await channel.fetch_message(955886808095399996)
+        ```
+        """
+        data = await aget(f'/channels/{self.id}/messages/{id}', self._token)
+        return Message(data, self._token)
     
+    async def history(
+            self,
+            limit: int | None = 100,
+            *,
+            before: int | Timestamp | None = None,
+            after: int | Timestamp | None = None,
+            around: int | Timestamp | None = None
+        ) -> 'AsyncIterator[Message]':
+        """
+        Iterate over messages of the channel, newest first (oldest first with
+        only `after`). `limit=None` iterates over all messages, `limit=0`
+        over none. Bounds are message ids or timestamps.
+
+        Messages are fetched in pages of 100 and the next page is fetched
+        while the current one is handled. `around` gets only one page.
+
+        ```
+        >>> async for message in channel.history(limit=None, after=Timestamp.from_iso('2023-01-01T00:00:00+00:00')):
+        ...     print(message.content)
+        ```
+        """
+        if limit is not None and limit <= 0:
+            return # discord allows limits of 1-100 only
+        if isinstance(before, Timestamp):
+            before = Snowflake.before(before)
+        if isinstance(after, Timestamp):
+            after = Snowflake.after(after)
+        if isinstance(around, Timestamp):
+            around = Snowflake.from_timestamp(around)
+
+        endpoint = f'/channels/{self.id}/messages'
+        forward = after is not None and before is None
+        remaining = limit
+
+        def fetch(cursor: int | None) -> 'Task[list[dict[str, Any]]]':
+            params = {'limit': min(remaining, 100) if remaining is not None else 100}
+            if around is not None:
+                params['around'] = int(around)
+            elif forward:
+                params['after'] = int(cursor)
+            elif cursor is not None:
+                params['before'] = int(cursor)
+            return create_task(aget(endpoint, self._token, params=params))
+
+        task = fetch(after if forward else before)
+        try:
+            while task is not None:
+                page = await task
+                task = None
+                full = len(page) == 100
+                if forward:
+                    page = page[::-1] # oldest first; don't reverse the shared list in place
+                elif after is not None and page and int(page[-1]['id']) <= int(after):
+                    page = [i for i in page if int(i['id']) > int(after)]
+                    full = False
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+
+                if full and around is None and remaining != 0:
+                    task = fetch(page[-1]['id'])
+                for data in page:
+                    yield Message(data, self._token)
+        finally:
+            if task is not None:
+                task.cancel()
+
     async def send(self, content: str) -> 'Message':
         payload = MessagePayload(content)
-        data = await apost(f'/channels/{self.id}/messages', self.__token, data=payload.eval())
-        return Message(data, self.__token)
-
-class Message:
-    def __init__(self, data: dict[str, Any], token: str) -> None:
-        self.id = get_snowflake(data.get('id'))
-        self.author = User(data.get('author'), token)
-        self.content = data.get('content')
-        self.timestamp: Timestamp = Timestamp.from_iso(data.get('timestamp'))
-        self.edited_timestamp: Timestamp = Timestamp.from_iso(data.get('edited_timestamp'))
-        self.tts = data.get('tts')
-        self.mention_everyone = data.get('mention_everyone')
-        self.mentions = get_list_of_types(User, data.get('mentions'), token)
-        self.mention_roles = data.get('mention_roles')
-        self.mention_channels = data.get('mention_channels')
-        self.attachments = data.get('attachments')
-        self.embeds = data.get('embeds')
-        self.reactions = data.get('reactions')
-        self.nonce = data.get('nonce')
-        self.pinned = data.get('pinned')
-        self.webhook_id = get_snowflake(data.get('webhook_id'))
-        self.type = data.get('type')
-        self.activity = data.get('activity')
-        self.application = data.get('application')
-        self.application_id = get_snowflake(data.get('application_id'))
-        self.message_reference = data.get('message_reference')
-        self.flags = data.get('flags')
-        self.referenced_message = data.get('referenced_message')
-        self.interaction = data.get('interaction')
-        self.thread = data.get('thread')
-        self.components = data.get('components')
-        self.sticker_items = data.get('sticker_items')
-        self.stickers = data.get('stickers')
-        self.position = data.get('position')
-        self.role_subscription_data = data.get('role_subscription_data')
-
-        # Extra fields for message create
-        self.guild_id = get_snowflake(data.get('guild_id'))
-        self.member = data.get('member')
-
-        self.__channel_id = data.get('channel_id')
-        self.__token = token
-        self.__data = data
+        data = await apost(f'/channels/{self.id}/messages', self._token, data=payload.eval())
+        return Message(data, self._token)
+
+class Message(Model):
+    __slots__ = ()
+
+    id: int = Field(convert=get_snowflake)
+    author: User = Field(model=get_user)
+    content: str = Field()
+    timestamp: Timestamp = Field(convert=Timestamp.from_iso)
+    edited_timestamp: Timestamp | None = Field(convert=Timestamp.from_iso)
+    tts: bool = Field()
+    mention_everyone: bool = Field()
+    mentions: list[User] | None = Field(model=get_user, many=True)
+    mention_roles = Field()
+    mention_channels = Field()
+    attachments = Field()
+    embeds = Field()
+    reactions = Field()
+    nonce = Field()
+    pinned: bool = Field()
+    webhook_id: int | None = Field(convert=get_snowflake)
+    type: int = Field()
+    activity = Field()
+    application = Field()
+    application_id: int | None = Field(convert=get_snowflake)
+    message_reference = Field()
+    flags: int | None = Field()
+    referenced_message = Field()
+    interaction = Field()
+    thread = Field()
+    components = Field()
+    sticker_items = Field()
+    stickers = Field()
+    position: int | None = Field()
+    role_subscription_data = Field()
+
+    # Extra fields for message create
+    guild_id: int | None = Field(convert=get_snowflake)
+    member = Field()
+
+    __channel_id = Field('channel_id')
 
     @property
     def channel(self) -> GuildChannel:
-        data = rget(f'/channels/{self.__channel_id}', self.__token).json()
-        return GuildChannel(data, self.__token)
+        if (data := get_state(self._token).get_channel(self.__channel_id)) is None:
+            data = cached_rget(f'/channels/{self.__channel_id}', self._token, 'channel')
+        return GuildChannel(data, self._token)
     
     @property
     def guild(self) -> Guild | None:
         return self.channel.guild
+
+    async def fetch_channel(self, *, fresh: bool = False) -> GuildChannel:
+        if fresh or (data := get_state(self._token).get_channel(self.__channel_id)) is None:
+            data = await aget(f'/channels/{self.__channel_id}', self._token, cache='channel', fresh=fresh)
+        return GuildChannel(data, self._token)
+
+    async def fetch_guild(self, *, fresh: bool = False) -> Guild | None:
+        if self.guild_id:
+            if fresh or (data := get_state(self._token).get_guild(self.guild_id)) is None:
+                data = await aget(f'/guilds/{self.guild_id}', self._token, cache='guild', fresh=fresh)
+            return Guild(data, self._token)
+        return await (await self.fetch_channel(fresh=fresh)).fetch_guild(fresh=fresh)
     
     def __int__(self) -> int:
         return self.id
@@ -487,14 +661,11 @@ class Message:
     def __repr__(self) -> str:
         return self.content
     
-    def eval(self) -> dict[str, Any]:
-        return self.__data
-    
     async def reply(self, content: str) -> 'Message':
         payload = MessagePayload(content)
         payload.make_reply(self.id)
-        data = await apost(f'/channels/{self.__channel_id}/messages', self.__token, data=payload.eval())
-        return Message(data, self.__token)
+        data = await apost(f'/channels/{self.__channel_id}/messages', self._token, data=payload.eval())
+        return Message(data, self._token)
 
 class MessageDeleteEvent:
     def __init__(self, data: dict[str, Any], token: str) -> None:
@@ -506,12 +677,24 @@ class MessageDeleteEvent:
     
     @property
     def channel(self) -> GuildChannel:
-        data = rget(f'/channels/{self.__channel_id}', self.__token).json()
+        if (data := get_state(self.__token).get_channel(self.__channel_id)) is None:
+            data = cached_rget(f'/channels/{self.__channel_id}', self.__token, 'channel')
         return GuildChannel(data, self.__token)
     
     @property
     def guild(self) -> Guild:
-        data = rget(f'/guilds/{self.__guild_id}', self.__token).json()
+        if (data := get_state(self.__token).get_guild(self.__guild_id)) is None:
+            data = cached_rget(f'/guilds/{self.__guild_id}', self.__token, 'guild')
+        return Guild(data, self.__token)
+
+    async def fetch_channel(self, *, fresh: bool = False) -> GuildChannel:
+        if fresh or (data := get_state(self.__token).get_channel(self.__channel_id)) is None:
+            data = await aget(f'/channels/{self.__channel_id}', self.__token, cache='channel', fresh=fresh)
+        return GuildChannel(data, self.__token)
+
+    async def fetch_guild(self, *, fresh: bool = False) -> Guild:
+        if fresh or (data := get_state(self.__token).get_guild(self.__guild_id)) is None:
+            data = await aget(f'/guilds/{self.__guild_id}', self.__token, cache='guild', fresh=fresh)
         return Guild(data, self.__token)
 
     def __int__(self) -> int:
@@ -1,6 +1,6 @@
 from abc import ABC as AbstractClass
 from abc import abstractmethod as abstract_method
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
 if TYPE_CHECKING:
     from pytecord.web import GatewayOutput
@@ -10,7 +10,16 @@ class BaseDataStreamListener(AbstractClass):
     def listen(self, request: 'GatewayOutput'): ...
 
 class Object(AbstractClass):
+    __slots__ = ()
     @abstract_method
     def __int__(self) -> int: ...
     @abstract_method
     def eval(self) -> dict[str, Any]: ...
+
+class BaseCodec(AbstractClass):
+    name: str
+    encoding: Literal['json', 'etf']
+    @abstract_method
+    def loads(self, data: str | bytes) -> Any: ...
+    @abstract_method
+    def dumps(self, obj: Any) -> str | bytes: ...
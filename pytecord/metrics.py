@@ -0,0 +1,67 @@
+from collections import deque
+from typing import Iterable
+
+
+class RollingHistogram:
+    """
+    Histogram of the latest `size` samples (for example heartbeat latencies
+    in seconds). `counts()` groups the samples by the upper `bounds` of the
+    buckets.
+
+    ```
+    >>> histogram = RollingHistogram(size=3)
+    >>> for i in (0.1, 0.2, 0.3, 0.4):
+    ...     histogram.add(i)
+    >>> histogram.samples
+    deque([0.2, 0.3, 0.4], maxlen=3)
+    ```
+    """
+    def __init__(
+            self,
+            size: int = 1000,
+            bounds: Iterable[float] = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        ) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+        self.bounds = tuple(sorted(bounds))
+        self.total = 0
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.total += 1
+
+    @property
+    def last(self) -> float | None:
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def mean(self) -> float | None:
+        return sum(self.samples) / len(self.samples) if self.samples else None
+
+    @property
+    def max(self) -> float | None:
+        return max(self.samples) if self.samples else None
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Get the `p` percentile (from `0` to `1`) of the samples.
+        """
+        if not self.samples:
+            return None
+        values = sorted(self.samples)
+        return values[min(int(len(values) * p), len(values) - 1)]
+
+    def counts(self) -> dict[float, int]:
+        """
+        Get the number of samples in every bucket as `{upper bound: count}`.
+        The last bucket (`inf`) has all samples greater than the last bound.
+        """
+        result = dict.fromkeys(self.bounds + (float('inf'),), 0)
+        for value in self.samples:
+            for bound in result:
+                if value <= bound:
+                    result[bound] += 1
+                    break
+        return result
+
+    def __len__(self) -> int:
+        return len(self.samples)
@@ -0,0 +1,125 @@
+from typing import Any, Callable, Hashable
+from weakref import WeakValueDictionary
+
+from .interfaces import Object
+
+_MISSING = object()
+
+
+class Field:
+    """
+    Field of a `Model` that is read from the raw payload on first access.
+
+    `key` is the key in the payload (the name of the attribute by default).
+    Values are passed to `convert`, or to `model(value, token)` (for every
+    item with `many=True`) if they aren't empty; `model` is a model class or
+    a function like `get_user`. Converted values are cached, so they are
+    built once. Assigned values replace the payload value.
+    """
+    __slots__ = ('name', 'key', 'convert', 'model', 'many')
+
+    def __init__(
+            self,
+            key: str = None,
+            convert: Callable[[Any], Any] = None,
+            *,
+            model: Callable[[dict[str, Any], str], Any] = None,
+            many: bool = False
+        ) -> None:
+        self.name = key
+        self.key = key
+        self.convert = convert
+        self.model = model
+        self.many = many
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        if self.key is None:
+            self.key = name
+
+    def __get__(self, instance: 'Model | None', owner: type = None) -> Any:
+        if instance is None:
+            return self
+        cache = instance._cache
+        if cache is not None and (value := cache.get(self.name, _MISSING)) is not _MISSING:
+            return value
+
+        value = instance._data.get(self.key)
+        if self.convert is None and self.model is None:
+            return value
+        if self.model is not None:
+            if not value:
+                value = None
+            elif self.many:
+                value = [self.model(i, instance._token) for i in value]
+            else:
+                value = self.model(value, instance._token)
+        else:
+            value = self.convert(value)
+
+        if cache is None:
+            cache = instance._cache = {}
+        cache[self.name] = value
+        return value
+
+    def __set__(self, instance: 'Model', value: Any) -> None:
+        if instance._cache is None:
+            instance._cache = {}
+        instance._cache[self.name] = value
+
+
+class Model(Object):
+    """
+    Base of models that keep only the raw payload: fields are `Field`
+    descriptors, so fields that are never used cost nothing.
+    """
+    __slots__ = ('_data', '_token', '_cache', '__weakref__')
+
+    def __init__(self, data: dict[str, Any], token: str = None) -> None:
+        self._data = data
+        self._token = token
+        self._cache: dict[str, Any] | None = None
+
+    def eval(self) -> dict[str, Any]:
+        return self._data
+
+    def update(self, data: dict[str, Any]) -> None:
+        """
+        Update the model with a newer payload of the same entity. Partial
+        payloads are merged into the current one.
+        """
+        old = self._data
+        if data is old or data == old:
+            return
+        self._data = data if data.keys() >= old.keys() else dict(old, **data)
+        self._cache = None
+
+
+class IdentityMap:
+    """
+    Weak map of models by their ids: while a model is referenced anywhere,
+    payloads of the same entity update it instead of creating a new one.
+    """
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.__models: WeakValueDictionary[Hashable, Model] = WeakValueDictionary()
+
+    def get(self, key: Hashable | None, model: type[Model], data: dict[str, Any], token: str = None) -> Model:
+        """
+        Get the model of `key` updated with `data`, or create it. Models
+        without a key (`None`) are always created.
+        """
+        if key is None:
+            return model(data, token)
+        if (result := self.__models.get(key)) is not None:
+            self.hits += 1
+            result.update(data)
+            return result
+
+        self.misses += 1
+        result = self.__models[key] = model(data, token)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.__models)
@@ -46,10 +46,11 @@ class Presence:
         self.afk = afk
     
     def register(self, webhook: BaseWebhook):
-        if webhook.stream.running:
-            create_task(webhook.stream.send_request(GatewayRequest(3, {
-                'since': self.since,
-                'activities': [i.eval() for i in self.activities],
-                'status': self.status,
-                'afk': self.afk
-            })))
+        for stream in webhook.streams.values():
+            if stream.running:
+                create_task(stream.send_request(GatewayRequest(3, {
+                    'since': self.since,
+                    'activities': [i.eval() for i in self.activities],
+                    'status': self.status,
+                    'afk': self.afk
+                })))
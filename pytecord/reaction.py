@@ -1,6 +1,6 @@
 from typing import Any
 from .role import Role
-from .user import User
+from .user import User, get_user
 from .utils import get_snowflake, get_list_of_types
 
 
@@ -15,7 +15,7 @@ class Emoji:
         self.id: int = get_snowflake(data.get('id'))
         self.name: str | None = data.get('name')
         self.roles: list[Role] | None = get_list_of_types(Role, data.get('roles'))
-        self.user: User = User(data.get('user'), token)
+        self.user: User | None = get_user(x, token) if (x := data.get('user')) else None
         self.require_colons: bool | None = data.get('require_colons')
         self.managed: bool | None = data.get('managed')
         self.animated: bool | None = data.get('animated')
@@ -34,5 +34,5 @@ class Sticker:
         self.format_type: int = data.get('format_type')
         self.available: bool | None = data.get('available')
         self.guild_id: int | None = get_snowflake(data.get('guild_id'))
-        self.user: User | None = User(x, token) if (x := data.get('user')) else None
+        self.user: User | None = get_user(x, token) if (x := data.get('user')) else None
         self.sort_value: int | None = data.get('sort_value')
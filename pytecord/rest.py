@@ -0,0 +1,524 @@
+from asyncio import Lock, Task, create_task, shield
+from asyncio import sleep as asleep
+from collections import deque
+from copy import deepcopy
+from random import uniform
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any, Callable, Mapping
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
+from aiohttp.client_exceptions import ClientConnectionError, ClientPayloadError, ContentTypeError
+
+from .cache import ResponseCache
+from .config import API_URL, API_VERSION
+
+if TYPE_CHECKING:
+    from .interfaces import BaseCodec
+
+MAJOR_PARAMETERS = ('channels', 'guilds', 'webhooks')
+
+
+class DiscordException(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+def get_headers(token: str):
+    return {'Authorization': f'Bot {token}', 'content-Type': 'application/json'}
+
+
+def get_route(method: str, endpoint: str) -> tuple[str, str]:
+    """
+    Split an endpoint into its route and major parameter.
+
+    ```
+    >>> get_route('GET', '/channels/123/messages/456')
+    ('GET /channels/{channel_id}/messages/{id}', '123')
+    ```
+    """
+    parts = endpoint.split('?', 1)[0].split('/')
+    major = ''
+
+    if len(parts) > 2 and parts[1] in ('interactions', 'webhooks') and len(parts) > 3:
+        # interaction and webhook tokens are the part of the major parameter
+        major = f'{parts[2]}/{parts[3]}'
+        parts[2] = '{id}'
+        parts[3] = '{token}'
+
+    for i in range(2, len(parts)):
+        if not parts[i].isdigit():
+            continue
+        if not major and parts[i - 1] in MAJOR_PARAMETERS:
+            major = parts[i]
+            parts[i] = '{%s_id}' % parts[i - 1][:-1]
+        else:
+            parts[i] = '{id}'
+    return f'{method} {"/".join(parts)}', major
+
+
+class Bucket:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at: float = 0.0
+        self.window = 0.0
+        self.outgoing = 0
+        self.probing = False
+        self.probed = False
+
+    def delay(self) -> float:
+        if self.remaining is not None and self.remaining <= 0:
+            return max(self.reset_at - monotonic(), 0.0)
+        return 0.0
+
+    def reset(self) -> None:
+        # the next window starts with the next request
+        self.remaining = self.limit
+        self.reset_at = monotonic() + self.window
+
+    def take(self) -> None:
+        if self.remaining is not None and self.remaining <= 0:
+            self.reset()
+        if self.remaining is not None:
+            self.remaining -= 1
+
+
+class RateLimiter:
+    """
+    Rate limit buckets of the REST API.
+
+    Buckets are keyed by route and major parameter until discord tells the
+    bucket hash in the `X-RateLimit-Bucket` header. Requests to the same
+    bucket wait in a FIFO queue (the lock of the bucket) until the bucket
+    has requests left, so nothing is dropped when the limit is reached.
+
+    The limits of a new bucket are unknown until its first response, so only
+    the first request is sent and the others wait until it is released.
+    Buckets whose reset time has passed are dropped every `prune_interval`
+    seconds.
+    """
+    def __init__(self, global_limit: int = 50, prune_interval: float = 60.0) -> None:
+        self.global_limit = global_limit
+        self.prune_interval = prune_interval
+        self.buckets: dict[str, Bucket] = {}
+        self.hashes: dict[str, str] = {}
+
+        self._prune_at = monotonic() + prune_interval
+        self._global_reset_at = 0.0
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def get_bucket(self, route: str, major: str) -> Bucket:
+        key = f'{self.hashes.get(route, route)}:{major}'
+        if (bucket := self.buckets.get(key)) is None:
+            if monotonic() >= self._prune_at:
+                self.prune()
+            bucket = self.buckets[key] = Bucket()
+        return bucket
+
+    def prune(self) -> None:
+        """
+        Drop buckets whose reset time has passed and that no request holds.
+        """
+        now = monotonic()
+        self._prune_at = now + self.prune_interval
+        for key, bucket in list(self.buckets.items()):
+            if bucket.reset_at <= now and not bucket.outgoing and not bucket.lock.locked():
+                del self.buckets[key]
+
+    async def _wait_global(self) -> None:
+        while True:
+            now = monotonic()
+            if (delay := self._global_reset_at - now) > 0:
+                await asleep(delay)
+                continue
+            if now - self._window_start >= 1:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count < self.global_limit:
+                self._window_count += 1
+                return
+            await asleep(self._window_start + 1 - now)
+
+    async def acquire(self, route: str, major: str) -> Bucket:
+        """
+        Wait until a request to the route can be sent. Returns the bucket of
+        the request, it must be passed to `release()` when the request is done.
+        """
+        bucket = self.get_bucket(route, major)
+        await bucket.lock.acquire()
+        try:
+            while (delay := bucket.delay()) > 0:
+                await asleep(delay)
+            bucket.take()
+            await self._wait_global()
+        except BaseException:
+            bucket.lock.release()
+            raise
+
+        bucket.outgoing += 1
+        if bucket.remaining is None and not bucket.probed:
+            # keep the lock until the response tells the limits of the bucket
+            bucket.probing = True
+        else:
+            bucket.lock.release()
+        return bucket
+
+    def acquire_blocking(self, route: str, major: str) -> Bucket:
+        """
+        Blocking version of `acquire` for sync requests. It doesn't queue
+        behind requests of the event loop, the caller must decrease
+        `outgoing` of the bucket when the request is done.
+        """
+        bucket = self.get_bucket(route, major)
+        while (delay := max(bucket.delay(), self._global_reset_at - monotonic())) > 0:
+            sleep(delay)
+        bucket.take()
+        bucket.outgoing += 1
+        return bucket
+
+    def release(self, bucket: Bucket) -> None:
+        """
+        Mark a request of the bucket as done, even if it failed. Requests
+        waiting for the first response of the bucket go on.
+        """
+        bucket.outgoing -= 1
+        if bucket.probing:
+            bucket.probing = False
+            bucket.probed = True
+            bucket.lock.release()
+
+    def update(self, route: str, major: str, headers: Mapping[str, str]) -> None:
+        if (bucket_hash := headers.get('X-RateLimit-Bucket')) and self.hashes.get(route) != bucket_hash:
+            # keep the same bucket object, so requests already queued stay in order
+            bucket = self.get_bucket(route, major)
+            self.hashes[route] = bucket_hash
+            self.buckets.setdefault(f'{bucket_hash}:{major}', bucket)
+
+        if (remaining := headers.get('X-RateLimit-Remaining')) is None:
+            return
+        bucket = self.get_bucket(route, major)
+        reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+        reset_at = monotonic() + reset_after
+        bucket.window = max(bucket.window, reset_after)
+        if bucket.remaining is not None and reset_at < bucket.reset_at - bucket.window / 2:
+            return # the response is from an earlier window
+
+        bucket.limit = int(headers.get('X-RateLimit-Limit', 1))
+        # other requests in flight aren't counted in the headers yet
+        bucket.remaining = max(int(remaining) - bucket.outgoing + 1, 0)
+        bucket.reset_at = reset_at
+
+    def ratelimited(self, route: str, major: str, retry_after: float, is_global: bool) -> None:
+        if is_global:
+            self._global_reset_at = monotonic() + retry_after
+        else:
+            bucket = self.get_bucket(route, major)
+            bucket.remaining = 0
+            bucket.reset_at = monotonic() + retry_after
+
+
+class RetryPolicy:
+    """
+    Retries of failed requests. Requests are retried after connection
+    errors, timeouts and the `statuses` responses, waiting a random time up
+    to `base * 2 ** attempt` seconds (but at most `cap`) between attempts.
+    All attempts of one request must finish within `deadline` seconds, not
+    counting the time the request waits for the rate limits.
+
+    Only `methods` are retried, because other requests (like POST) could be
+    done twice.
+    """
+    def __init__(
+            self,
+            max_retries: int = 3,
+            base: float = 0.5,
+            cap: float = 10.0,
+            deadline: float = 30.0,
+            statuses: tuple[int, ...] = (500, 502, 503, 504),
+            methods: tuple[str, ...] = ('GET', 'HEAD', 'PUT', 'DELETE')
+        ) -> None:
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+        self.deadline = deadline
+        self.statuses = statuses
+        self.methods = methods
+
+    def can_retry(self, method: str) -> bool:
+        return method in self.methods
+
+    def backoff(self, attempt: int) -> float:
+        return uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+class HTTPStats:
+    """
+    Counters of the HTTP client. `coalesced` is the number of GET requests
+    that were not sent because the same request was already in flight.
+    `retries` is the number of retried attempts (`retries_by_route` per
+    route) and `failed` the number of requests that failed after retries.
+    `waits` keeps how long the latest requests
+    waited for the rate limits as `(route, seconds)` tuples.
+    """
+    def __init__(self, history: int = 1000) -> None:
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failed = 0
+        self.retries_by_route: dict[str, int] = {}
+        self.ratelimited = 0
+        self.total_wait = 0.0
+        self.last_wait = 0.0
+        self.waits: deque[tuple[str, float]] = deque(maxlen=history)
+
+    def record_wait(self, route: str, wait: float) -> None:
+        self.requests += 1
+        self.total_wait += wait
+        self.last_wait = wait
+        self.waits.append((route, wait))
+
+    def record_retry(self, route: str) -> None:
+        self.retries += 1
+        self.retries_by_route[route] = self.retries_by_route.get(route, 0) + 1
+
+
+async def _read(r: ClientResponse, loads: Callable[[str], Any]) -> Any:
+    try:
+        return await r.json(loads=loads)
+    except ContentTypeError:
+        return await r.text() or None
+
+
+class HTTPClient:
+    """
+    HTTP client for the discord REST API.
+
+    One client holds one long-lived `aiohttp.ClientSession`, so connections
+    to discord are kept alive and reused between requests instead of doing
+    a new TCP and TLS handshake every time. The session is created lazily
+    on the first request (it must be created inside the running event loop)
+    and must be closed with `close()` on shutdown.
+
+    Every client is registered by its token, so helpers like `apost` and
+    `adelete` find the client of the bot automatically.
+
+    Request and response bodies are encoded with `codec` (the fastest
+    installed JSON codec by default). The REST API only speaks JSON, so
+    ETF codecs are replaced with a JSON one.
+    """
+    def __init__(
+            self,
+            token: str = None,
+            *,
+            api_url: str = None,
+            limit: int = 100,
+            limit_per_host: int = 0,
+            keepalive_timeout: float = 60,
+            ttl_dns_cache: int = 300,
+            cache_size: int = 1000,
+            cache_ttls: dict[str, float] = None,
+            retry_policy: RetryPolicy = None,
+            codec: 'BaseCodec' = None
+        ) -> None:
+        from .codec import get_codec
+
+        self.token = token
+        self.headers = get_headers(token) if token else {}
+        self.base_url = f'{api_url or API_URL}/v{API_VERSION}'
+
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+
+        self.ratelimiter = RateLimiter()
+        self.stats = HTTPStats()
+        self.cache = ResponseCache(cache_size, cache_ttls)
+        self.max_ratelimit_retries = 5
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.codec = codec if codec is not None and codec.encoding == 'json' else get_codec()
+
+        self._session: ClientSession | None = None
+        self._inflight: dict[tuple, Task] = {}
+
+        _clients[token] = self
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache
+            )
+            self._session = ClientSession(headers=self.headers, connector=connector, json_serialize=self.codec.dumps)
+        return self._session
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def request(
+            self,
+            method: str,
+            endpoint: str,
+            *,
+            data: Any = None,
+            params: dict[str, Any] = None,
+            headers: dict[str, Any] = None,
+            cache: str = None,
+            fresh: bool = False,
+            retry: bool = None
+        ) -> Any:
+        """
+        Send a request. Concurrent GET requests of the same resource share one
+        request: the caller that sent it gets the decoded body and the others
+        get deep copies of it, so callers can change their results.
+
+        GET requests with `cache` (kind of the entity, for example `guild`)
+        are served from the response cache until the time to live of the kind
+        expires. `fresh=True` skips the cached response and refreshes it.
+        The cache keeps its own copy of the response, cached responses are
+        shared by every caller of a cache hit and must not be changed.
+        Other methods invalidate cached responses of the endpoint.
+
+        `retry` overrides whether the request can be retried by the retry
+        policy (by default only idempotent methods are retried).
+        """
+        if method != 'GET':
+            self.cache.invalidate_prefix(endpoint)
+            return await self._request(method, endpoint, data, params, headers, retry)
+        if headers:
+            return await self._request(method, endpoint, data, params, headers, retry)
+
+        cache = cache if not params else None
+        if cache and not fresh and (cached := self.cache.get(endpoint)) is not None:
+            return cached
+
+        key = (endpoint, tuple(sorted(params.items())) if params else None)
+        if (task := self._inflight.get(key)) is not None:
+            self.stats.coalesced += 1
+            result = deepcopy(await shield(task))
+        else:
+            task = self._inflight[key] = create_task(self._request(method, endpoint, data, params, headers, retry))
+            task.add_done_callback(lambda t: self._request_done(key, t))
+            result = await shield(task)
+
+        if cache:
+            self.cache.set(endpoint, deepcopy(result), cache)
+        return result
+
+    def _request_done(self, key: tuple, task: Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # retrieved here too, because all waiters of the shared request can be cancelled
+            task.exception()
+
+    async def _request(
+            self,
+            method: str,
+            endpoint: str,
+            data: Any,
+            params: dict[str, Any] | None,
+            headers: dict[str, Any] | None,
+            retry: bool | None = None
+        ) -> Any:
+        route, major = get_route(method, endpoint)
+        policy = self.retry_policy
+        can_retry = policy.can_retry(method) if retry is None else retry
+        deadline = None
+
+        waited = 0.0
+        ratelimits = 0
+        attempt = 0
+
+        while True:
+            start = monotonic()
+            bucket = await self.ratelimiter.acquire(route, major)
+            wait = monotonic() - start
+            waited += wait
+            # time in the rate limit queues doesn't count against the deadline
+            deadline = monotonic() + policy.deadline if deadline is None else deadline + wait
+            timeout = ClientTimeout(total=max(deadline - monotonic(), 0.001))
+
+            try:
+                async with self.session.request(
+                    method, self.base_url + endpoint, json=data, params=params, headers=headers, timeout=timeout
+                ) as r:
+                    self.ratelimiter.update(route, major, r.headers)
+
+                    if 200 <= r.status < 300:
+                        self.stats.record_wait(route, waited)
+                        try:
+                            return await r.json(loads=self.codec.loads)
+                        except ContentTypeError:
+                            return None
+
+                    body = await _read(r, self.codec.loads)
+
+                    if r.status == 429:
+                        body = body if isinstance(body, dict) else {}
+                        retry_after = float(body.get('retry_after') or r.headers.get('Retry-After', 1))
+                        is_global = body.get('global', False) or 'X-RateLimit-Global' in r.headers
+
+                        self.stats.ratelimited += 1
+                        self.ratelimiter.ratelimited(route, major, retry_after, is_global)
+
+                        ratelimits += 1
+                        if ratelimits > self.max_ratelimit_retries:
+                            self.stats.record_wait(route, waited)
+                            raise DiscordException(body)
+                        continue
+
+                    error = DiscordException(body)
+                    if not (can_retry and r.status in policy.statuses):
+                        raise error
+            except (ClientConnectionError, ClientPayloadError, TimeoutError) as e:
+                if not can_retry:
+                    raise
+                error = e
+            finally:
+                self.ratelimiter.release(bucket)
+
+            delay = policy.backoff(attempt)
+            if attempt >= policy.max_retries or monotonic() + delay >= deadline:
+                self.stats.failed += 1
+                raise error
+
+            attempt += 1
+            self.stats.record_retry(route)
+            await asleep(delay)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_clients: dict[str | None, HTTPClient] = {}
+
+def get_http(token: str = None) -> HTTPClient:
+    """
+    Get the registered HTTP client for `token`. If there is no client for
+    this token yet, a new one is created and registered.
+    """
+    return _clients.get(token) or HTTPClient(token)
+
+
+async def aget(
+        endpoint: str, token: str = None, headers: dict[str, Any] = None, params: dict[str, Any] = None,
+        *, cache: str = None, fresh: bool = False
+    ):
+    return await get_http(token).request('GET', endpoint, params=params, headers=headers, cache=cache, fresh=fresh)
+
+async def apost(endpoint: str, token: str = None, headers: dict[str, Any] = None, data: dict[str, Any] = None):
+    return await get_http(token).request('POST', endpoint, data=data, headers=headers)
+
+async def aput(endpoint: str, token: str = None, headers: dict[str, Any] = None, data: Any = None):
+    return await get_http(token).request('PUT', endpoint, data=data, headers=headers)
+
+async def adelete(endpoint: str, token: str = None, headers: dict[str, Any] = None):
+    return await get_http(token).request('DELETE', endpoint, headers=headers)
@@ -0,0 +1,142 @@
+"""
+Discord ids (snowflakes) without network I/O.
+
+```
+>>> id = Snowflake(175928847299117063)
+>>> id.created_at.to_tuple()
+(2016, 4, 30, 11, 18, 25)
+>>> Snowflake.after(Timestamp.from_iso('2023-01-01T00:00:00+00:00'))
+Snowflake(1058897343283199999)
+```
+
+A snowflake is a 64-bit integer: milliseconds since the discord epoch
+(42 bits), worker id (5 bits), process id (5 bits) and increment (12 bits).
+"""
+
+from array import array
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterable
+
+from .timestamp import Timestamp
+
+if TYPE_CHECKING:
+    import numpy
+
+DISCORD_EPOCH = 1420070400000 # first millisecond of 2015
+
+TIMESTAMP_SHIFT = 22
+WORKER_MASK = 0x3E0000
+PROCESS_MASK = 0x1F000
+INCREMENT_MASK = 0xFFF
+
+
+def _milliseconds(timestamp: Timestamp | datetime | float) -> int:
+    if isinstance(timestamp, Timestamp):
+        timestamp = timestamp.get()
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.timestamp()
+    return int(timestamp * 1000)
+
+
+class Snowflake(int):
+    """
+    Discord id. It is an `int`, so it can be used everywhere ids are.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_timestamp(cls, timestamp: Timestamp | datetime | float, *, high: bool = False) -> 'Snowflake':
+        """
+        Get the lowest (or the highest with `high=True`) snowflake of the
+        millisecond. Unix time is in seconds.
+        """
+        value = (_milliseconds(timestamp) - DISCORD_EPOCH) << TIMESTAMP_SHIFT
+        return cls(value | ((1 << TIMESTAMP_SHIFT) - 1) if high else value)
+
+    @classmethod
+    def before(cls, timestamp: Timestamp | datetime | float) -> 'Snowflake':
+        """
+        Bound for `before=` of the API: ids less than it were created before
+        `timestamp`.
+        """
+        return cls.from_timestamp(timestamp)
+
+    @classmethod
+    def after(cls, timestamp: Timestamp | datetime | float) -> 'Snowflake':
+        """
+        Bound for `after=` of the API: ids greater than it were created at
+        `timestamp` or later.
+        """
+        return cls(cls.from_timestamp(timestamp) - 1)
+
+    @property
+    def unix_ms(self) -> int:
+        return (self >> TIMESTAMP_SHIFT) + DISCORD_EPOCH
+
+    @property
+    def created_at(self) -> Timestamp:
+        return Timestamp(datetime.fromtimestamp(self.unix_ms / 1000, timezone.utc))
+
+    @property
+    def worker_id(self) -> int:
+        return (self & WORKER_MASK) >> 17
+
+    @property
+    def process_id(self) -> int:
+        return (self & PROCESS_MASK) >> 12
+
+    @property
+    def increment(self) -> int:
+        return self & INCREMENT_MASK
+
+    def __str__(self) -> str:
+        return int.__repr__(self)
+
+    def __repr__(self) -> str:
+        return f'Snowflake({int.__repr__(self)})'
+
+
+def snowflake_time(id: int | str | None) -> Timestamp | None:
+    """
+    Get the creation time of an id (`None` for empty ids).
+    """
+    return Snowflake(id).created_at if id else None
+
+
+def decode(ids: Iterable[int | str], *, use_numpy: bool = None) -> 'dict[str, array | numpy.ndarray]':
+    """
+    Decode many ids at once. Returns columns `unix_ms`, `worker_id`,
+    `process_id` and `increment`: NumPy arrays if NumPy is installed (or
+    `use_numpy=True`), otherwise `array` arrays of 64-bit integers.
+    """
+    from .utils import check_module
+
+    if use_numpy is None:
+        use_numpy = check_module('numpy')
+    if use_numpy:
+        return _decode_numpy(ids)
+
+    values = array('Q', map(int, ids))
+    return {
+        'unix_ms': array('q', [(i >> TIMESTAMP_SHIFT) + DISCORD_EPOCH for i in values]),
+        'worker_id': array('q', [(i & WORKER_MASK) >> 17 for i in values]),
+        'process_id': array('q', [(i & PROCESS_MASK) >> 12 for i in values]),
+        'increment': array('q', [i & INCREMENT_MASK for i in values])
+    }
+
+
+def _decode_numpy(ids: Iterable[int | str]) -> 'dict[str, numpy.ndarray]':
+    import numpy
+
+    if isinstance(ids, numpy.ndarray):
+        values = ids.astype(numpy.uint64, copy=False)
+    else:
+        values = numpy.array([int(i) for i in ids], dtype=numpy.uint64)
+    # numpy scalars, so uint64 isn't promoted to float64
+    uint = numpy.uint64
+    return {
+        'unix_ms': ((values >> uint(TIMESTAMP_SHIFT)) + uint(DISCORD_EPOCH)).astype(numpy.int64),
+        'worker_id': ((values & uint(WORKER_MASK)) >> uint(17)).astype(numpy.int64),
+        'process_id': ((values & uint(PROCESS_MASK)) >> uint(12)).astype(numpy.int64),
+        'increment': (values & uint(INCREMENT_MASK)).astype(numpy.int64)
+    }
@@ -0,0 +1,214 @@
+from typing import TYPE_CHECKING, Any, Callable
+
+from .cache import TTLCache
+from .model import IdentityMap
+from .rest import get_http
+from .utils import get_snowflake
+
+if TYPE_CHECKING:
+    from .web import GatewayOutput
+
+
+class ConnectionState:
+    """
+    In-memory state of guilds, channels, roles and members of the bot.
+
+    The state is filled from the GUILD_CREATE dispatches that follow READY
+    and is kept current by the update and delete events, so lookups like
+    `client.get_guild`, `guild.channels` and `guild.roles` don't need any
+    network I/O. Raw payloads are stored and models are created on access.
+
+    Every entity type has its own size limit (`max_*`, `None` means no
+    limit, least recently used entities are evicted first) and can be
+    turned off with the `cache_*` flags.
+    """
+    def __init__(
+            self,
+            token: str = None,
+            *,
+            cache_guilds: bool = True,
+            cache_channels: bool = True,
+            cache_roles: bool = True,
+            cache_members: bool = True,
+            max_guilds: int | None = None,
+            max_channels: int | None = None,
+            max_roles: int | None = None,
+            max_members: int | None = 10000
+        ) -> None:
+        self.guilds = TTLCache(max_guilds if cache_guilds else 0)
+        self.channels = TTLCache(max_channels if cache_channels else 0)
+        self.roles = TTLCache(max_roles if cache_roles else 0)
+        self.members = TTLCache(max_members if cache_members else 0)
+
+        self.guild_channels: dict[int, set[int]] = {}
+        self.guild_roles: dict[int, set[int]] = {}
+
+        # `User` and `GuildMember` models shared by all events, see `get_user`
+        self.users = IdentityMap()
+        self.guild_members = IdentityMap()
+
+        self.parsers: dict[str, Callable[[dict[str, Any]], None]] = {
+            'GUILD_CREATE': self.parse_guild_create,
+            'GUILD_UPDATE': self.parse_guild_update,
+            'GUILD_DELETE': self.parse_guild_delete,
+            'CHANNEL_CREATE': self.parse_channel_update,
+            'CHANNEL_UPDATE': self.parse_channel_update,
+            'CHANNEL_DELETE': self.parse_channel_delete,
+            'GUILD_ROLE_CREATE': self.parse_guild_role_update,
+            'GUILD_ROLE_UPDATE': self.parse_guild_role_update,
+            'GUILD_ROLE_DELETE': self.parse_guild_role_delete,
+            'GUILD_MEMBER_ADD': self.parse_guild_member_update,
+            'GUILD_MEMBER_UPDATE': self.parse_guild_member_update,
+            'GUILD_MEMBER_REMOVE': self.parse_guild_member_remove
+        }
+
+        self.bind(token)
+
+    def bind(self, token: str) -> None:
+        """
+        Register the state for `token`, so models created with this token
+        use it.
+        """
+        self.token = token
+        _states[token] = self
+
+    def parse(self, request: 'GatewayOutput') -> None:
+        if parser := self.parsers.get(request.t):
+            parser(request.d)
+
+    # Lookups
+
+    def get_guild(self, id: int) -> dict[str, Any] | None:
+        return self.guilds.get(int(id))
+
+    def get_channel(self, id: int) -> dict[str, Any] | None:
+        return self.channels.get(int(id))
+
+    def get_member(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        return self.members.get((int(guild_id), int(user_id)))
+
+    def get_guild_channels(self, guild_id: int) -> list[dict[str, Any]] | None:
+        """
+        Get channels of the guild. Returns `None` if the state doesn't know all
+        channels of the guild (it isn't cached or some channels were evicted).
+        """
+        return self.__get_all(self.channels, self.guild_channels.get(int(guild_id)))
+
+    def get_guild_roles(self, guild_id: int) -> list[dict[str, Any]] | None:
+        """
+        Get roles of the guild. Returns `None` if the state doesn't know all
+        roles of the guild.
+        """
+        return self.__get_all(self.roles, self.guild_roles.get(int(guild_id)))
+
+    def __get_all(self, cache: TTLCache, ids: set[int] | None) -> list[dict[str, Any]] | None:
+        if ids is None:
+            return None
+        result = []
+        for id in ids:
+            if (data := cache.get(id)) is None:
+                return None
+            result.append(data)
+        return result
+
+    # Parsers
+
+    def __invalidate(self, endpoint: str) -> None:
+        get_http(self.token).cache.invalidate(endpoint)
+
+    def __store_guild(self, guild_id: int, data: dict[str, Any]) -> None:
+        if self.guilds.maxsize != 0:
+            self.guilds.set(guild_id, {
+                k: v for k, v in data.items()
+                if k not in ('channels', 'threads', 'roles', 'members', 'presences', 'voice_states')
+            })
+
+    def parse_guild_create(self, data: dict[str, Any]) -> None:
+        guild_id = int(data['id'])
+        if data.get('unavailable'):
+            return
+        self.__store_guild(guild_id, data)
+
+        if self.channels.maxsize != 0 and 'channels' in data:
+            self.guild_channels[guild_id] = set()
+            for channel in data['channels']:
+                channel['guild_id'] = data['id']
+                self.parse_channel_update(channel)
+
+        if self.roles.maxsize != 0 and 'roles' in data:
+            self.guild_roles[guild_id] = set()
+            for role in data['roles']:
+                self.parse_guild_role_update({'guild_id': data['id'], 'role': role})
+
+        for member in data.get('members', []):
+            self.parse_guild_member_update(dict(member, guild_id=data['id']))
+
+    def parse_guild_update(self, data: dict[str, Any]) -> None:
+        guild_id = int(data['id'])
+        self.__invalidate(f'/guilds/{guild_id}')
+        if (old := self.guilds.get(guild_id)) is not None:
+            self.__store_guild(guild_id, dict(old, **data))
+
+    def parse_guild_delete(self, data: dict[str, Any]) -> None:
+        guild_id = int(data['id'])
+        self.__invalidate(f'/guilds/{guild_id}')
+        if data.get('unavailable'):
+            return
+
+        self.guilds.pop(guild_id)
+        for id in self.guild_channels.pop(guild_id, ()):
+            self.channels.pop(id)
+        for id in self.guild_roles.pop(guild_id, ()):
+            self.roles.pop(id)
+        for key in self.members.keys():
+            if key[0] == guild_id:
+                self.members.pop(key)
+
+    def parse_channel_update(self, data: dict[str, Any]) -> None:
+        channel_id = int(data['id'])
+        self.__invalidate(f'/channels/{channel_id}')
+        self.channels.set(channel_id, data)
+
+        if (guild_id := get_snowflake(data.get('guild_id'))) and guild_id in self.guild_channels:
+            self.guild_channels[guild_id].add(channel_id)
+
+    def parse_channel_delete(self, data: dict[str, Any]) -> None:
+        channel_id = int(data['id'])
+        self.__invalidate(f'/channels/{channel_id}')
+        self.channels.pop(channel_id)
+
+        if guild_id := get_snowflake(data.get('guild_id')):
+            self.guild_channels.get(guild_id, set()).discard(channel_id)
+
+    def parse_guild_role_update(self, data: dict[str, Any]) -> None:
+        guild_id = int(data['guild_id'])
+        role = data['role']
+        self.roles.set(int(role['id']), role)
+
+        if guild_id in self.guild_roles:
+            self.guild_roles[guild_id].add(int(role['id']))
+
+    def parse_guild_role_delete(self, data: dict[str, Any]) -> None:
+        role_id = int(data['role_id'])
+        self.roles.pop(role_id)
+        self.guild_roles.get(int(data['guild_id']), set()).discard(role_id)
+
+    def parse_guild_member_update(self, data: dict[str, Any]) -> None:
+        if self.members.maxsize == 0:
+            return
+        key = (int(data['guild_id']), int(data['user']['id']))
+        old = self.members.get(key)
+        self.members.set(key, dict(old, **data) if old else data)
+
+    def parse_guild_member_remove(self, data: dict[str, Any]) -> None:
+        self.members.pop((int(data['guild_id']), int(data['user']['id'])))
+
+
+_states: dict[str | None, ConnectionState] = {}
+
+def get_state(token: str = None) -> ConnectionState:
+    """
+    Get the registered state for `token`. If there is no state for this
+    token yet, a new one is created and registered.
+    """
+    return _states.get(token) or ConnectionState(token)
@@ -5,8 +5,8 @@ from time import mktime
 
 class Timestamp:
     @staticmethod
-    def from_iso(timestamp: str) -> 'Timestamp':
-        return Timestamp(datetime.fromisoformat(timestamp))
+    def from_iso(timestamp: str | None) -> 'Timestamp | None':
+        return Timestamp(datetime.fromisoformat(timestamp)) if timestamp else None
     
     @staticmethod
     def from_unix(unix_time: int) -> 'Timestamp':
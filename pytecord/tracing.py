@@ -0,0 +1,152 @@
+import json
+from logging import DEBUG, Formatter, Logger, LogRecord, StreamHandler, getLogger
+from random import random
+from time import time
+from typing import TYPE_CHECKING, Any, Literal, TextIO
+
+from .utils import check_module
+
+if TYPE_CHECKING:
+    from .web import GatewayRequest
+
+gateway_log = getLogger('pytecord.gateway')
+
+
+class Payload:
+    """
+    Payload of a log record, it is converted to a string (and truncated to
+    `max_length` characters) only if the record is formatted.
+    """
+    __slots__ = ('data', 'max_length')
+
+    def __init__(self, data: Any, max_length: int | None = 1000) -> None:
+        self.data = data
+        self.max_length = max_length
+
+    def __str__(self) -> str:
+        text = str(self.data)
+        if self.max_length is not None and len(text) > self.max_length:
+            return f'{text[:self.max_length]}... ({len(text)} chars)'
+        return text
+
+
+class GatewayTracer:
+    """
+    Debug logging of gateway payloads to the `pytecord.gateway` logger and
+    to an optional JSON lines trace file.
+
+    Nothing is done while the logger isn't enabled for `DEBUG` and there is
+    no trace file. `sample_rates` is the part of payloads (from `0` to `1`)
+    that is traced by event type (`t`, or `op` for other payloads), others
+    are traced with `default_rate`. Payloads in log records are truncated to
+    `max_payload` characters.
+
+    The trace file gets one JSON object per traced payload with its time,
+    direction, shard, op, sequence, event type and size in bytes (and the
+    payload itself with `trace_payloads=True`).
+    """
+    def __init__(
+            self,
+            logger: Logger = None,
+            *,
+            sample_rates: dict[str | int, float] = None,
+            default_rate: float = 1.0,
+            max_payload: int | None = 1000,
+            trace_file: str | TextIO | None = None,
+            trace_payloads: bool = False
+        ) -> None:
+        self.logger = logger or gateway_log
+        self.sample_rates = sample_rates or {}
+        self.default_rate = default_rate
+        self.max_payload = max_payload
+        self.trace_payloads = trace_payloads
+
+        self.__sink: TextIO | None = None
+        self.__own_sink = False
+        if trace_file is not None:
+            self.open(trace_file)
+
+    @property
+    def enabled(self) -> bool:
+        return self.__sink is not None or self.logger.isEnabledFor(DEBUG)
+
+    def open(self, trace_file: str | TextIO) -> None:
+        self.close()
+        if isinstance(trace_file, str):
+            self.__sink = open(trace_file, 'a', encoding='utf-8')
+            self.__own_sink = True
+        else:
+            self.__sink = trace_file
+            self.__own_sink = False
+
+    def close(self) -> None:
+        if self.__sink is not None:
+            if self.__own_sink:
+                self.__sink.close()
+            else:
+                self.__sink.flush()
+        self.__sink = None
+
+    def trace(self, direction: Literal['send', 'receive'], data: 'GatewayRequest', shard_id: int = 0, size: int = None) -> None:
+        key = data.t if data.t is not None else data.op
+        rate = self.sample_rates.get(key, self.default_rate)
+        if rate < 1.0 and random() >= rate:
+            return
+
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(
+                '%s shard:%s op:%s s:%s t:%s d:%s',
+                direction.upper(), shard_id, data.op, data.s, data.t, Payload(data.d, self.max_payload)
+            )
+        if self.__sink is not None:
+            record = {
+                'time': time(),
+                'direction': direction,
+                'shard': shard_id,
+                'op': data.op,
+                's': data.s,
+                't': data.t,
+                'size': size
+            }
+            if self.trace_payloads:
+                record['d'] = data.d
+            self.__sink.write(json.dumps(record, default=str) + '\n')
+
+
+class ColorFormatter(Formatter):
+    """
+    Formatter that colors gateway records with colorama.
+    """
+    def __init__(self) -> None:
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        import colorama
+        colorama.init()
+        self.colors = {
+            'DEBUG': colorama.Fore.YELLOW,
+            'INFO': colorama.Fore.GREEN,
+            'WARNING': colorama.Fore.MAGENTA,
+            'ERROR': colorama.Fore.RED,
+            'CRITICAL': colorama.Fore.RED
+        }
+        self.reset = colorama.Fore.RESET
+
+    def format(self, record: LogRecord) -> str:
+        return f'{self.colors.get(record.levelname, "")}{super().format(record)}{self.reset}'
+
+
+_handler: StreamHandler | None = None
+
+def setup_logging(level: int = DEBUG) -> None:
+    """
+    Print records of the `pytecord` loggers to stderr (colored if colorama
+    is installed). It is used by `Client(debug=True)`, applications with
+    their own logging configuration don't need it.
+    """
+    global _handler
+
+    logger = getLogger('pytecord')
+    logger.setLevel(level)
+    if _handler is None:
+        _handler = StreamHandler()
+        _handler.setFormatter(ColorFormatter() if check_module('colorama') else Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        logger.addHandler(_handler)
@@ -1,36 +1,34 @@
 from typing import Any, Literal
 
-from .interfaces import Object
+from .model import Field, Model
 from .annotations import hash_str
+from .state import get_state
 from .utils import get_snowflake
+from .snowflake import snowflake_time
 from .timestamp import Timestamp
 
-class User(Object):
-    def __init__(self, data: dict[str, Any], token: str) -> None:
-        self.id: int = get_snowflake(data.get('id'))
-        self.username: str = data.get('username')
-        self.discriminator: str | None = data.get('discriminator')
-        self.global_name: str | None = data.get('global_name')
-        self.avatar: hash_str | None = data.get('avatar')
-        self.bot: bool | None = data.get('bot')
-        self.system: bool | None = data.get('system')
-        self.mfa_enabled: bool | None = data.get('mfa_enabled')
-        self.banner: hash_str | None = data.get('banner')
-        self.accent_color: int | None = data.get('accent_color')
-        self.locale: str | None = data.get('locale')
-        self.verified: bool | None = data.get('verified')
-        self.email: str | None = data.get('email')
-        self.flags: int | None = data.get('flags')
-        self.premium_type: int | None = data.get('premium_type')
-        self.public_flags: int | None = data.get('public_flags')
-        self.avatar_decoration: hash_str | None = data.get('avatar_decoration')
+class User(Model):
+    __slots__ = ()
+
+    id: int = Field(convert=get_snowflake)
+    created_at: Timestamp = Field('id', snowflake_time)
+    username: str = Field()
+    discriminator: str | None = Field()
+    global_name: str | None = Field()
+    avatar: hash_str | None = Field()
+    bot: bool | None = Field()
+    system: bool | None = Field()
+    mfa_enabled: bool | None = Field()
+    banner: hash_str | None = Field()
+    accent_color: int | None = Field()
+    locale: str | None = Field()
+    verified: bool | None = Field()
+    email: str | None = Field()
+    flags: int | None = Field()
+    premium_type: int | None = Field()
+    public_flags: int | None = Field()
+    avatar_decoration: hash_str | None = Field()
 
-        self.__token = token
-        self.__data = data
-    
-    def eval(self) -> dict[str, Any]:
-        return self.__data
-    
     @property
     def mention(self) -> str:
         return f'<@{self.id}>'
@@ -43,39 +41,65 @@ class User(Object):
     
     def __repr__(self) -> str:
         return self.mention
-    
 
-class GuildMember(Object):
-    def __init__(self, data: dict[str, Any], token: str) -> None:
-        self.user: User | None = User(x, token) if (x := data.get('user')) else None
-        self.nick: str | None = data.get('nick')
-        self.avatar: str | None = data.get('avatar')
-        self.roles: int = data.get('roles')
-        self.joined_at: str = data.get('joined_at')
-        self.premium_since: str | None = data.get('premium_since')
-        self.deaf: bool = data.get('deaf')
-        self.mute: bool = data.get('mute')
-        self.flags: int = data.get('flags')
-        self.pending: bool | None = data.get('pending')
-        self.permissions: str | None = data.get('permissions')
-        self.communication_disabled_until: str | None = data.get('communication_disabled_until')
 
-        self.__data = data
+def get_user(data: dict[str, Any], token: str) -> User:
+    """
+    Get the `User` of the payload. While a user is referenced anywhere, all
+    payloads with its id update and return the same object.
+    """
+    return get_state(token).users.get(get_snowflake(data.get('id')), User, data, token)
+
+class GuildMember(Model):
+    __slots__ = ()
+
+    user: User | None = Field(model=get_user)
+    nick: str | None = Field()
+    avatar: str | None = Field()
+    roles: list[str] = Field()
+    joined_at: str = Field()
+    premium_since: str | None = Field()
+    deaf: bool = Field()
+    mute: bool = Field()
+    flags: int = Field()
+    pending: bool | None = Field()
+    permissions: str | None = Field()
+    communication_disabled_until: str | None = Field()
     
     def __int__(self) -> int | Literal[0]:
         return self.user.id if self.user else 0
     
-    def eval(self) -> dict[str, Any]:
-        return self.__data
-    
     def __str__(self) -> str | Literal['']:
         return self.nick if self.nick else ''
 
 
+def get_member(data: dict[str, Any], token: str, guild_id: int = None) -> GuildMember:
+    """
+    Get the shared `GuildMember` of the payload. Members are shared only if
+    the guild is known (`guild_id` or the `guild_id` of the payload),
+    otherwise just their user is.
+    """
+    guild_id = guild_id or get_snowflake(data.get('guild_id'))
+    user_id = get_snowflake(x.get('id')) if (x := data.get('user')) else None
+    key = (int(guild_id), user_id) if guild_id and user_id else None
+    return get_state(token).guild_members.get(key, GuildMember, data, token)
+
+
+class GuildMembersChunk:
+    def __init__(self, data: dict[str, Any], token: str) -> None:
+        self.guild_id: int = get_snowflake(data.get('guild_id'))
+        self.members: list[GuildMember] = [get_member(i, token, self.guild_id) for i in data.get('members', [])]
+        self.chunk_index: int = data.get('chunk_index')
+        self.chunk_count: int = data.get('chunk_count')
+        self.not_found: list[int] = [int(i) for i in data.get('not_found', [])]
+        self.presences: list[dict[str, Any]] | None = data.get('presences')
+        self.nonce: str | None = data.get('nonce')
+
+
 class ThreadMember:
     def __init__(self, data: dict[str, Any], token: str) -> None:
         self.id: int | None = get_snowflake(data.get('id'))
         self.user_id: int | None = get_snowflake(data.get('user_id'))
         self.join_timestamp: Timestamp = Timestamp.from_iso(data.get('join_timestamp'))
         self.flags: int = data.get('flags')
-        self.member: GuildMember | None = GuildMember(x, token) if (x := data.get('member')) else None
+        self.member: GuildMember | None = get_member(x, token) if (x := data.get('member')) else None
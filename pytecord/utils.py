@@ -1,11 +1,7 @@
 import json
 from typing import Any, TypeVar
 
-from aiohttp import ClientSession
-from aiohttp.client_exceptions import ContentTypeError
-from requests import get
-
-from .config import API_VERSION
+from .rest import DiscordException, get_headers, get_http, get_route, aget, apost, aput, adelete
 from .enums import ApplicationCommandOptionType
 from .timestamp import Timestamp
 from .annotations import hex_str, height, width
@@ -13,11 +9,6 @@ from .annotations import hex_str, height, width
 T = TypeVar('T')
 
 
-class DiscordException(Exception):
-    def __init__(self, *args: object) -> None:
-        super().__init__(*args)
-
-
 # API/GATEWAY
 
 class Color:
@@ -220,43 +211,52 @@ class MessagePayload:
         return self.json
 
 
-def get_headers(token: str):
-    return {'Authorization': f'Bot {token}', 'content-Type': 'application/json'}
+def rget(endpoint: str, token: str = None, payload: dict[str, Any] = None, headers: dict[str, Any] = None, params: dict[str, Any] = None):
+    """
+    Blocking GET request. It is kept for the sync properties only, don't
+    use it inside the event loop: use `aget` instead. It waits for the rate
+    limits of the HTTP client and sends rate limited requests again.
+    """
+    from requests import get
 
-def rget(endpoint: str, token: str = None, payload: dict[str, Any] = None, headers: dict[str, Any] = None):
     if token:
         headers = get_headers(token)
-    
-    resp = get(f'https://discord.com/api/v{API_VERSION}{endpoint}', headers=headers, json=payload)
+
+    http = get_http(token)
+    route, major = get_route('GET', endpoint)
+    for _ in range(http.max_ratelimit_retries + 1):
+        bucket = http.ratelimiter.acquire_blocking(route, major)
+        try:
+            resp = get(http.base_url + endpoint, headers=headers, json=payload, params=params)
+            http.ratelimiter.update(route, major, resp.headers)
+        finally:
+            bucket.outgoing -= 1
+        if resp.status_code != 429:
+            break
+
+        body = resp.json()
+        retry_after = float(body.get('retry_after') or resp.headers.get('Retry-After', 1))
+        is_global = body.get('global', False) or 'X-RateLimit-Global' in resp.headers
+        http.ratelimiter.ratelimited(route, major, retry_after, is_global)
 
     if str(resp.status_code).startswith('2'):
         return resp
     else:
         raise DiscordException(resp.json())
 
-async def apost(endpoint: str, token: str = None, headers: dict[str, Any] = None, data: dict[str, Any] = None):
-    if token:
-        headers = get_headers(token)
-    async with ClientSession(headers=headers) as s:
-        async with s.post(f'https://discord.com/api/v{API_VERSION}{endpoint}', json=data) as r:
-            if str(r.status).startswith('2'):
-                try:
-                    return await r.json()
-                except ContentTypeError:
-                    return None
-            raise DiscordException(await r.json())
-
-async def adelete(endpoint: str, token: str = None, headers: dict[str, Any] = None):
-    if token:
-        headers = get_headers(token)
-    async with ClientSession(headers=headers) as s:
-        async with s.delete(f'https://discord.com/api/v{API_VERSION}{endpoint}') as r:
-            if str(r.status).startswith('2'):
-                try:
-                    return await r.json()
-                except ContentTypeError:
-                    return None
-            raise DiscordException(await r.json())
+def cached_rget(endpoint: str, token: str, cache: str, fresh: bool = False) -> Any:
+    """
+    Blocking GET request of an entity (`cache` is its kind, for example
+    `guild`) that goes through the response cache of the HTTP client.
+    Returns the json data.
+    """
+    http_cache = get_http(token).cache
+    if not fresh and (data := http_cache.get(endpoint)) is not None:
+        return data
+
+    data = rget(endpoint, token).json()
+    http_cache.set(endpoint, data, cache)
+    return data
 
 # OTHER
 
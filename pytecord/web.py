@@ -1,19 +1,34 @@
-from asyncio import create_task, gather
+import json
+from asyncio import FIRST_COMPLETED, FIRST_EXCEPTION, CancelledError, Event, Future, Lock, PriorityQueue, Queue, Semaphore, TimeoutError
+from asyncio import as_completed, create_task, get_running_loop, wait, wait_for
 from asyncio import sleep as asleep
 from datetime import datetime
-from time import mktime
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, Literal
+from itertools import count
+from random import uniform
+from time import mktime, monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Literal
+from logging import getLogger
+from zlib import decompressobj
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession, WSMsgType
 
-from .commands import AppllicationCommand, Interaction
-from .config import GATEWAY_VERSION
-from .interfaces import BaseDataStreamListener
-from .utils import apost, adelete, get_headers, rget, check_module
+from .codec import get_codec
+from .commands import AppllicationCommand, Interaction, get_commands_hash
+from .config import GATEWAY_URL, GATEWAY_VERSION
+from .dispatch import EventDispatcher, Handler, Middleware
+from .interfaces import BaseCodec, BaseDataStreamListener
+from .metrics import RollingHistogram
+from .rest import DiscordException, HTTPClient, RetryPolicy
+from .state import ConnectionState
+from .tracing import GatewayTracer, setup_logging
+from .utils import aget, aput, get_headers, rget, cached_rget
 
 if TYPE_CHECKING:
     from .guild import Guild, GuildChannel
-    from .user import User
+    from .user import GuildMember, GuildMembersChunk, User
+
+
+_log = getLogger(__name__)
 
 
 class GatewayRequest:
@@ -28,6 +43,7 @@ class GatewayRequest:
         self.d = d
         self.s = s
         self.t = t
+        self.shard_id = 0
 
     def __repr__(self) -> str:
         return f'GatewayRequest(op={self.op}, d={self.d}, s={self.s}, t={self.t})'
@@ -48,12 +64,229 @@ class GatewayOutput(GatewayRequest): ... # For typing
 
 
 class DataStreamListener:
-    def __init__(self, events: dict[str, Callable[[GatewayRequest], Coroutine[Any, Any, Any]]] = {}) -> None:
-        self.events = events
+    """
+    Event bus of the gateway dispatches. Every event type can have many
+    handlers, they are called in the order they were added.
+
+    Middlewares are called before the handlers of an event (of the `events`
+    they were added for, or all events) and can drop the event by returning
+    `False`. The handlers and middlewares of every event type are collected
+    into a table when they change, so events without handlers cost one dict
+    lookup.
+
+    Errors of the state update, middlewares and handlers are logged and
+    counted in `failed`, so one bad event doesn't stop the gateway reader.
+    A failed middleware drops the event.
+    """
+    def __init__(
+            self,
+            events: dict[str, Handler] = None,
+            state: ConnectionState = None,
+            dispatcher: EventDispatcher = None,
+            chunker: 'MemberChunker' = None
+        ) -> None:
+        self.events: dict[str, list[Handler]] = {}
+        self.middlewares: list[tuple[frozenset[str] | None, Middleware]] = []
+        self.state = state
+        self.dispatcher = dispatcher
+        self.chunker = chunker
+        self.failed = 0
+        self.__table: dict[str, tuple[tuple[Middleware, ...], tuple[Handler, ...]]] = {}
+
+        for event_type, handler in (events or {}).items():
+            self.add_event(event_type, handler)
+
+    def add_event(self, event_type: str, handler: Handler):
+        self.events.setdefault(event_type, []).append(handler)
+        self.__build_table()
+
+    def remove_event(self, event_type: str, handler: Handler):
+        if handler in self.events.get(event_type, ()):
+            self.events[event_type].remove(handler)
+            self.__build_table()
+
+    def add_middleware(self, middleware: Middleware, events: list[str] = None):
+        self.middlewares.append((frozenset(events) if events is not None else None, middleware))
+        self.__build_table()
+
+    def __build_table(self):
+        self.__table = {
+            event_type: (
+                tuple(m for types, m in self.middlewares if types is None or event_type in types),
+                tuple(handlers)
+            )
+            for event_type, handlers in self.events.items() if handlers
+        }
 
     async def listen(self, request: GatewayRequest):
-        if self.events.get(request.t):
-            await self.events.get(request.t)(request)
+        # the state is updated in the order of the events, handlers can run
+        # later in the dispatcher
+        try:
+            if self.state is not None:
+                self.state.parse(request)
+            if request.t == 'GUILD_MEMBERS_CHUNK' and self.chunker is not None:
+                self.chunker.feed(request.d)
+        except Exception as e:
+            self.failed += 1
+            _log.error('State update of %s failed', request.t, exc_info=e)
+        if (entry := self.__table.get(request.t)) is None:
+            return
+
+        middlewares, handlers = entry
+        try:
+            for middleware in middlewares:
+                if not middleware(request):
+                    return
+        except Exception as e:
+            self.failed += 1
+            _log.error('Middleware of %s failed', request.t, exc_info=e)
+            return
+        for handler in handlers:
+            if self.dispatcher is not None:
+                await self.dispatcher.submit(handler, request)
+                continue
+            try:
+                await handler(request)
+            except Exception as e:
+                self.failed += 1
+                _log.error('Handler of %s failed', request.t, exc_info=e)
+
+
+ZLIB_SUFFIX = b'\x00\x00\xff\xff'
+
+# Close codes after which the connection must not be opened again
+FATAL_CLOSE_CODES = (4004, 4010, 4011, 4012, 4013, 4014)
+# Close codes after which the session can't be resumed
+SESSION_CLOSE_CODES = (4007, 4009)
+# Priorities of gateway commands in the send queue (lower are sent first):
+# heartbeats, then IDENTIFY and RESUME, then everything else
+SEND_PRIORITIES = {1: 0, 2: 1, 6: 1}
+DEFAULT_SEND_PRIORITY = 2
+
+
+class IdentifyLimiter:
+    """
+    Order of IDENTIFY of shards. Shards are split into `max_concurrency`
+    buckets (`shard_id % max_concurrency`) and every bucket can identify
+    once per `interval` seconds.
+    """
+    def __init__(self, max_concurrency: int = 1, interval: float = 5.0) -> None:
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self.__locks: dict[int, Lock] = {}
+        self.__last: dict[int, float] = {}
+
+    async def acquire(self, shard_id: int) -> None:
+        key = shard_id % self.max_concurrency
+        lock = self.__locks.setdefault(key, Lock())
+        async with lock:
+            if (last := self.__last.get(key)) is not None:
+                await asleep(max(last + self.interval - monotonic(), 0))
+            self.__last[key] = monotonic()
+
+
+class GatewayRateLimiter:
+    """
+    Token bucket of the commands sent on one gateway connection (discord
+    allows `limit` commands per `per` seconds). The bucket holds up to
+    `burst` tokens and gets `(limit - burst) / per` tokens a second, so no
+    `per` seconds have more than `limit` commands. The last `reserved`
+    tokens are only used by heartbeats, so `0 <= reserved < burst < limit`.
+    """
+    def __init__(self, limit: int = 120, per: float = 60.0, burst: int = None, reserved: int = 3) -> None:
+        burst = burst if burst is not None else limit // 2
+        if not 0 <= reserved < burst < limit:
+            raise ValueError(f'Expected 0 <= reserved < burst < limit, got reserved={reserved}, burst={burst}, limit={limit}')
+        if per <= 0:
+            raise ValueError(f'Expected a positive period, got per={per}')
+
+        self.limit = limit
+        self.per = per
+        self.burst = burst
+        self.reserved = reserved
+        self.rate = (limit - self.burst) / per
+        self.tokens = float(self.burst)
+        self.updated = monotonic()
+
+    def reset(self) -> None:
+        self.tokens = float(self.burst)
+        self.updated = monotonic()
+
+    def acquire(self, heartbeat: bool = False) -> float:
+        """
+        Take a token. Returns `0` if it was taken, otherwise the number of
+        seconds until there is one.
+        """
+        now = monotonic()
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.burst)
+        self.updated = now
+
+        needed = 1 if heartbeat else self.reserved + 1
+        if self.tokens >= needed:
+            self.tokens -= 1
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+class MemberChunker:
+    """
+    Requests of guild members over the gateway (op 8 REQUEST_GUILD_MEMBERS).
+    Every request has its own nonce, so GUILD_MEMBERS_CHUNK dispatches of
+    many requests can arrive at the same time.
+    """
+    def __init__(self, token: str, state: ConnectionState) -> None:
+        self.token = token
+        self.state = state
+        self.__nonces = count()
+        self.__requests: dict[str, tuple[Queue[dict[str, Any]], bool]] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self.__requests)
+
+    def feed(self, data: dict[str, Any]) -> None:
+        if (request := self.__requests.get(data.get('nonce'))) is None:
+            return
+        queue, cache = request
+        if cache:
+            for member in data['members']:
+                self.state.parse_guild_member_update(dict(member, guild_id=data['guild_id']))
+        queue.put_nowait(data)
+
+    async def request(
+            self,
+            stream: 'DataStream',
+            guild_id: int,
+            *,
+            query: str = '',
+            limit: int = 0,
+            user_ids: list[int] = None,
+            presences: bool = False,
+            cache: bool = True,
+            timeout: float = 30.0
+        ) -> 'AsyncIterator[GuildMembersChunk]':
+        from .user import GuildMembersChunk
+
+        nonce = str(next(self.__nonces))
+        queue = Queue()
+        self.__requests[nonce] = (queue, cache)
+
+        d = {'guild_id': str(guild_id), 'limit': limit, 'presences': presences, 'nonce': nonce}
+        if user_ids is not None:
+            d['user_ids'] = [str(i) for i in user_ids]
+        else:
+            d['query'] = query
+        try:
+            await stream.send_request(GatewayRequest(8, d))
+            received = 0
+            while True:
+                chunk = GuildMembersChunk(await wait_for(queue.get(), timeout), self.token)
+                yield chunk
+                received += 1
+                if received >= chunk.chunk_count:
+                    return
+        finally:
+            del self.__requests[nonce]
 
 
 class DataStream:
@@ -66,13 +299,67 @@ class DataStream:
             intents: int = 0,
             afk: bool = False,
             status: str = 'online',
-            activities: list[dict] = []
+            activities: list[dict] = [],
+            gateway_url: str = None,
+            compress: bool = False,
+            codec: BaseCodec = None,
+            shard: tuple[int, int] = None,
+            identify_limiter: IdentifyLimiter = None,
+            latencies: RollingHistogram = None,
+            tracer: GatewayTracer = None,
+            rate_limiter: GatewayRateLimiter = None
         ) -> None:
         self.listener = listener
         self._ws = None
+        self.gateway_url = gateway_url or GATEWAY_URL
         self.gateway_version = GATEWAY_VERSION
         self.headers = headers
         self.debug = debug
+        self.codec = codec or get_codec()
+        self.tracer = tracer or GatewayTracer()
+        if debug:
+            setup_logging()
+
+        # zlib-stream transport compression: one inflator per connection,
+        # frames are buffered until the zlib flush suffix arrives
+        self.compress = compress
+        self.bytes_received = 0
+        self.bytes_decompressed = 0
+        self._inflator = None
+        self._buffer = bytearray()
+
+        # session of the connection for RESUME
+        self.sequence: int | None = None
+        self.session_id: str | None = None
+        self.resume_gateway_url: str | None = None
+        self.reconnect_policy = RetryPolicy(base=1.0, cap=60.0)
+        self.reconnects = 0
+        self.__connected = False
+        self.__reconnect_delay = 0.0
+
+        # `[shard_id, num_shards]` of the connection, `None` without sharding
+        self.shard = shard
+        self.shard_id = shard[0] if shard else 0
+        self.identify_limiter = identify_limiter
+
+        # heartbeats, `latency` is the time between the last heartbeat and
+        # its ACK in seconds
+        self.heartbeat_interval: float | None = None
+        self.latency = float('inf')
+        self.latencies = latencies if latencies is not None else RollingHistogram()
+        self.zombies = 0
+        self.__heartbeat_sent: float | None = None
+        self.__heartbeat_acked = True
+        self.__listening = False
+
+        # outbound commands wait in a priority queue and are sent by one task
+        # per connection, `send_delays` keeps how long they waited in seconds
+        self.rate_limiter = rate_limiter or GatewayRateLimiter()
+        self.send_queue: PriorityQueue[tuple[int, int, GatewayRequest, Future, float]] = PriorityQueue()
+        self.send_delays = RollingHistogram(bounds=(0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0))
+        self.commands_sent = 0
+        self.__send_ids = count()
+        self.__queued = Event()
 
         self.running = False
 
@@ -83,206 +370,662 @@ class DataStream:
         self.status = status
         self.activities = activities
     
-    def __debug(self, data: GatewayRequest | GatewayOutput | None, type: Literal['send', 'receive']):
-        if self.debug and data:
-            have_colorama = check_module('colorama')
-            if have_colorama:
-                import colorama
-                colorama.init()
-    
-                x = f'{colorama.Fore.YELLOW}DEBUG {type.upper()} '
-                if data.op is not None:
-                    x += f'{colorama.Fore.GREEN}op:{data.op} '
-                if data.s is not None:
-                    x += f'{colorama.Fore.RED}s:{data.s} '
-                if data.d is not None:
-                    x += f'{colorama.Fore.BLUE}d:{data.d} '
-                if data.t is not None:
-                    x += f'{colorama.Fore.MAGENTA}t:{data.t}{colorama.Fore.RESET}'
-            else:
-                x = f'DEBUG {type.upper()} '
-                if data.op:
-                    x += f'op:{data.op} '
-                if data.s:
-                    x += f's:{data.s} '
-                if data.d:
-                    x += f'd:{data.d} '
-                if data.t:
-                    x += f't:{data.t}'
-            print(x, end='\n' * 2)
-
     async def receive_response(self) -> GatewayOutput | None:
-        try:
-            j = await self._ws.receive_json()
-            data = GatewayOutput(data=j) if j else None
-            self.__debug(data, 'receive')
-            return data
-        except TypeError:
+        message = await self._ws.receive()
+
+        if message.type == WSMsgType.TEXT:
+            raw = message.data
+            self.bytes_received += len(raw)
+            self.bytes_decompressed += len(raw)
+        elif message.type == WSMsgType.BINARY:
+            self.bytes_received += len(message.data)
+            if self.compress:
+                self._buffer.extend(message.data)
+                if self._buffer[-4:] != ZLIB_SUFFIX:
+                    return None
+                raw = self._inflator.decompress(self._buffer)
+                self._buffer.clear()
+            else:
+                raw = message.data # etf payloads
+            self.bytes_decompressed += len(raw)
+        else:
             return None
+
+        j = self.codec.loads(raw)
+        data = GatewayOutput(data=j) if j else None
+        if data is not None and self.tracer.enabled:
+            self.tracer.trace('receive', data, self.shard_id, len(raw))
+        return data
     
-    async def send_request(self, data: GatewayRequest) -> GatewayRequest:
-        await self._ws.send_json(data.eval())
-        request = GatewayRequest(data=data)
-        self.__debug(request, 'send')
-        return request
-    
+    async def send_request(self, data: GatewayRequest, priority: int = None) -> GatewayRequest:
+        """
+        Queue a command and wait until it is sent. Heartbeats are sent
+        first, then IDENTIFY and RESUME, others in the order they were
+        queued. Commands queued while the bot is disconnected are sent after
+        it connects again.
+        """
+        if priority is None:
+            priority = SEND_PRIORITIES.get(data.op, DEFAULT_SEND_PRIORITY)
+        future = get_running_loop().create_future()
+        self.send_queue.put_nowait((priority, next(self.__send_ids), data, future, monotonic()))
+        self.__queued.set()
+        await future
+        return GatewayRequest(data=data)
+
+    @property
+    def send_queue_size(self) -> int:
+        return self.send_queue.qsize()
+
+    async def __write(self, data: GatewayRequest) -> None:
+        payload = self.codec.dumps(data.eval())
+        if isinstance(payload, str):
+            await self._ws.send_str(payload)
+        else:
+            await self._ws.send_bytes(payload)
+        self.commands_sent += 1
+        if self.tracer.enabled:
+            request = GatewayRequest(data=data)
+            if request.op == 2 or request.op == 6: # don't trace the token
+                request = GatewayRequest(request.op, dict(request.d, token='...'))
+            self.tracer.trace('send', request, self.shard_id, len(payload))
+
+    async def sender(self):
+        """
+        Send queued commands while the connection is open, as fast as the
+        rate limiter allows.
+        """
+        queue = self.send_queue
+        while self.running and not self._ws.closed:
+            item = await queue.get()
+            priority, _, data, future, queued_at = item
+            if future.done(): # the sender of the command was cancelled
+                continue
+
+            if (delay := self.rate_limiter.acquire(priority == 0)) > 0:
+                # a heartbeat can be queued meanwhile, it has to go first
+                queue.put_nowait(item)
+                self.__queued.clear()
+                try:
+                    await wait_for(self.__queued.wait(), delay)
+                except TimeoutError:
+                    pass
+                continue
+
+            try:
+                if data.op == 1:
+                    # latency is measured from the write, not from the queue
+                    self.__heartbeat_sent = perf_counter()
+                await self.__write(data)
+            except CancelledError:
+                queue.put_nowait(item)
+                raise
+            except (ClientError, OSError):
+                # the connection is closed, send it after reconnecting
+                queue.put_nowait(item)
+                return
+            self.send_delays.add(monotonic() - queued_at)
+            if not future.done():
+                future.set_result(None)
+
     async def identify(self):
+        d = {
+            'token': self.token,
+            'intents': self.intents,
+            'properties': {
+                'os': 'windows',
+                'browser': 'pytecord',
+                'device': 'pytecord'
+            },
+            'presence': {
+                'since': mktime(datetime.now().timetuple()) * 1000,
+                'afk': self.afk,
+                'status': self.status,
+                'activities': self.activities
+            }
+        }
+        if self.shard:
+            d['shard'] = list(self.shard)
+        await self.send_request(GatewayRequest(op=2, d=d))
+    
+    async def resume(self):
         await self.send_request(GatewayRequest(
-            op=2,
+            op=6,
             d={
                 'token': self.token,
-                'intents': self.intents,
-                'properties': {
-                    'os': 'windows',
-                    'browser': 'pytecord',
-                    'device': 'pytecord'
-                },
-                'presence': {
-                    'since': mktime(datetime.now().timetuple()) * 1000,
-                    'afk': self.afk,
-                    'status': self.status,
-                    'activities': self.activities
-                }
+                'session_id': self.session_id,
+                'seq': self.sequence
             }
         ))
-    
+
+    @property
+    def can_resume(self) -> bool:
+        return self.session_id is not None and self.sequence is not None
+
+    def clear_session(self):
+        self.sequence = None
+        self.session_id = None
+        self.resume_gateway_url = None
+
+    async def reconnect(self):
+        """
+        Close the connection, so `run` connects again and resumes the session.
+        """
+        if self._ws is not None and not self._ws.closed:
+            # close codes 1000 and 1001 invalidate the session
+            await self._ws.close(code=4000)
+
+    async def heartbeat(self):
+        self.__heartbeat_acked = False
+        self.__heartbeat_sent = None # set by the sender
+        await self.send_request(GatewayRequest(1, self.sequence))
+
+    def heartbeat_ack(self):
+        self.__heartbeat_acked = True
+        if self.__heartbeat_sent is not None:
+            self.latency = perf_counter() - self.__heartbeat_sent
+            self.latencies.add(self.latency)
+            self.__heartbeat_sent = None
+
     async def life(self, heartbeat_interval: float):
-        while self.running:
-            await self.send_request(GatewayRequest(1))
+        """
+        Send heartbeats every `heartbeat_interval` seconds (the first one
+        after a random part of the interval). Beats are scheduled with a
+        monotonic clock, so a busy loop doesn't shift them. If the previous
+        heartbeat wasn't acknowledged the connection is a zombie and is
+        opened again.
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.__heartbeat_acked = True
+        self.__heartbeat_sent = None
 
-            await asleep(heartbeat_interval)
+        next_beat = monotonic() + heartbeat_interval * uniform(0, 1)
+        while self.running and not self._ws.closed:
+            await asleep(max(next_beat - monotonic(), 0))
+
+            # ACKs can't be read while the listener waits for the dispatcher
+            if not self.__heartbeat_acked and not self.__listening:
+                self.zombies += 1
+                await self.reconnect()
+                return
+            await self.heartbeat()
+
+            next_beat += heartbeat_interval
+            if next_beat < monotonic(): # the loop was blocked for more than an interval
+                next_beat = monotonic() + heartbeat_interval
     
     async def check_events(self):
-        while self.running:
-            if data := await self.receive_response():
-                ...
-            else:
+        while self.running and not self._ws.closed:
+            if (data := await self.receive_response()) is None:
                 continue
-            await self.listener.listen(data)
+
+            match data.op:
+                case 0:
+                    if data.t == 'READY':
+                        self.session_id = data.d['session_id']
+                        self.resume_gateway_url = data.d.get('resume_gateway_url')
+                    if data.t in ('READY', 'RESUMED'):
+                        self.__connected = True
+                    data.shard_id = self.shard_id
+                    self.__listening = True
+                    try:
+                        await self.listener.listen(data)
+                    finally:
+                        self.__listening = False
+                    # after the event is queued, so it is replayed if the
+                    # connection is closed before
+                    if data.s is not None:
+                        self.sequence = data.s
+                case 1: # HEARTBEAT, discord asks for a heartbeat right now
+                    await self.heartbeat()
+                case 11: # HEARTBEAT_ACK
+                    self.heartbeat_ack()
+                case 7: # RECONNECT
+                    await self.reconnect()
+                case 9: # INVALID_SESSION, `d` is whether the session can be resumed
+                    if not data.d:
+                        self.clear_session()
+                    # wait 1-5 seconds before the next handshake, in `run` so frames are still read
+                    self.__reconnect_delay = uniform(1, 5)
+                    await self.reconnect()
+
+    async def connect(self, session: ClientSession):
+        """
+        Open one connection to the gateway and read it until it is closed.
+        The session is resumed if possible, otherwise the bot identifies.
+        """
+        resume = self.can_resume
+        url = self.resume_gateway_url if resume and self.resume_gateway_url else self.gateway_url
+        url = f'{url.rstrip("/")}/?v={self.gateway_version}&encoding={self.codec.encoding}'
+        if self.compress:
+            url += '&compress=zlib-stream'
+
+        if not resume and self.identify_limiter is not None:
+            await self.identify_limiter.acquire(self.shard_id)
+
+        async with session.ws_connect(url) as ws:
+            self._ws = ws
+            self._inflator = decompressobj()
+            self._buffer.clear()
+
+            # with zlib-stream HELLO can be split across several messages
+            data = None
+            while data is None and not ws.closed:
+                data = await self.receive_response()
+            if data is None:
+                return
+
+            # discord counts commands of every connection separately
+            self.rate_limiter.reset()
+            handshake = create_task(self.resume() if resume else self.identify())
+            tasks = [
+                create_task(self.sender()),
+                create_task(self.life(data['d']['heartbeat_interval'] / 1000)),
+                create_task(self.check_events())
+            ]
+            done, pending = await wait(tasks, return_when=FIRST_COMPLETED)
+            for task in (*pending, handshake):
+                task.cancel()
+            for task in done:
+                task.result()
 
     async def run(self, intents: int = None):
+        """
+        Connect to the gateway and keep the connection alive. Dropped
+        connections are opened again (with a growing delay if they fail
+        again and again) and the session is resumed, so missed events are
+        replayed instead of identifying again.
+        """
         self.running = True
         if intents:
             self.intents = intents
 
+        attempt = 0
         async with ClientSession(headers=self.headers) as session:
-            async with session.ws_connect(
-                f'wss://gateway.discord.gg/?v={self.gateway_version}&encoding=json'
-            ) as ws:
-                self._ws = ws
+            while self.running:
+                self._ws = None
+                self.__connected = False
+                try:
+                    await self.connect(session)
+                except (ClientError, OSError, TimeoutError):
+                    pass
+                if not self.running:
+                    break
 
-                data = await self.receive_response()
-                await self.identify()
+                code = self._ws.close_code if self._ws is not None else None
+                if code in FATAL_CLOSE_CODES:
+                    self.running = False
+                    raise DiscordException(f'Gateway connection was closed with code {code}')
+                if code in SESSION_CLOSE_CODES:
+                    self.clear_session()
 
-                await gather(
-                    create_task(self.life(data['d']['heartbeat_interval'] / 1000)),
-                    create_task(self.check_events())
-                )
+                attempt = 0 if self.__connected else attempt + 1
+                self.reconnects += 1
+                delay = max(self.reconnect_policy.backoff(attempt), self.__reconnect_delay)
+                self.__reconnect_delay = 0.0
+                await asleep(delay)
+        self.running = False
+
+    async def close(self):
+        self.running = False
+        while not self.send_queue.empty():
+            self.send_queue.get_nowait()[3].cancel()
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
 
 
 class BaseWebhook:
-    def __init__(self, token: str, debug: bool) -> None:
+    def __init__(
+            self,
+            token: str,
+            debug: bool,
+            commands_cache: str = None,
+            state: ConnectionState = None,
+            *,
+            api_url: str = None,
+            gateway_url: str = None,
+            compress: bool = False,
+            codec: str = None,
+            shards: int | Literal['auto'] | None = None,
+            shard_ids: list[int] = None,
+            dispatcher: EventDispatcher = None,
+            tracer: GatewayTracer = None
+        ) -> None:
         self.token = token
         self.debug = debug
+        self.commands_cache = commands_cache
         self.headers = get_headers(token)
+        self.codec = get_codec(codec)
+        self.http = HTTPClient(token, api_url=api_url, codec=self.codec)
+        self.state = state if state is not None else ConnectionState()
+        self.state.bind(token)
         self.commands: dict[int, dict[AppllicationCommand, Callable]] = {1: {}, 2: {}, 3: {}}
 
-        self.listener = DataStreamListener()
-        self.stream = DataStream(self.listener, self.headers, self.token, self.debug)
+        self.dispatcher = dispatcher if dispatcher is not None else EventDispatcher()
+        self.chunker = MemberChunker(token, self.state)
+        self.listener = DataStreamListener(state=self.state, dispatcher=self.dispatcher, chunker=self.chunker)
+
+        # shards share the listener (and the state), the HTTP client and
+        # the latency histogram
+        self.shard_count = shards
+        self.shard_ids = shard_ids
+        self.identify_limiter = IdentifyLimiter()
+        self.latencies = RollingHistogram()
+        self.tracer = tracer or GatewayTracer()
+        self.__stream_options = {'gateway_url': gateway_url, 'compress': compress, 'codec': self.codec}
+        self.streams: dict[int, DataStream] = {}
+        if shards != 'auto':
+            self.make_streams()
+
+        self.__commands_hash = None
+        self.__commands_lock = Lock()
+        self.add_event('INTERACTION_CREATE', self.__interaction_create)
 
     def add_event(self, event_type: str, function: Callable):
-        self.listener.events[event_type] = function
+        self.listener.add_event(event_type, function)
+
+    def remove_event(self, event_type: str, function: Callable):
+        self.listener.remove_event(event_type, function)
+
+    def add_middleware(self, function: Middleware, events: list[str] = None):
+        self.listener.add_middleware(function, events)
 
     def add_command(self, command: AppllicationCommand, function: Callable):
         self.commands[command.type][command] = function
     
     async def register_app_commands(self, data: GatewayOutput):
+        """
+        Sync application commands with discord.
+
+        The local commands are hashed and compared with the fingerprint of the
+        last sync (kept in memory and, if `commands_cache` is set, in that
+        file) or with the commands on the server. If something changed, all
+        commands are replaced with one bulk overwrite request, otherwise
+        nothing is sent. Reconnects don't register commands again.
+        """
         app_id = data.d['application']['id']
 
-        for type in range(1, 3):
-            for command, func in self.commands[type].items():
-                if self.debug:
-                    print(f'DEBUG POST /applications/.../commands with {command.eval()}')
-                await apost(f'/applications/{app_id}/commands', self.token, data=command.eval())
-        
-        commands = rget(f'/applications/{app_id}/commands', self.token).json()
+        payload = [command.eval() for type in (1, 2, 3) for command in self.commands[type]]
+        fingerprint = get_commands_hash(payload)
 
-        names = {1: [], 2: [], 3: []}
-        for i in range(1, 3):
-            for code_command in self.commands[i]:
-                names[i].append(code_command.name)
-        
-        commands_by_types = {1: [], 2: [], 3: []}
-
-        for command in commands:
-            commands_by_types[command['type']].append(command)
-
-        for i in range(1, 3):
-            for server_command in commands_by_types[i]:
-                if server_command['name'] not in names[i]:
-                    id_to_delete = server_command['id']
-                    if self.debug:
-                        print(f'DEBUG DELETE /applications/.../commands/{id_to_delete}')
-                    await adelete(f'/applications/{app_id}/commands/{id_to_delete}', self.token)
+        async with self.__commands_lock: # READY of every shard
+            if fingerprint == self.__commands_hash:
+                return
+            if fingerprint != self.__read_commands_fingerprint(app_id):
+                server_commands = await aget(f'/applications/{app_id}/commands', self.token)
+                server_payload = [AppllicationCommand(i['name'], data=i).eval() for i in server_commands]
+
+                if get_commands_hash(server_payload) != fingerprint:
+                    _log.debug('Overwriting %s application commands', len(payload))
+                    await aput(f'/applications/{app_id}/commands', self.token, data=payload)
+                self.__write_commands_fingerprint(app_id, fingerprint)
+
+            self.__commands_hash = fingerprint
+
+    def __read_commands_fingerprint(self, app_id: str) -> str | None:
+        if not self.commands_cache:
+            return None
+        try:
+            with open(self.commands_cache, 'r', encoding='utf-8') as f:
+                return json.load(f).get(str(app_id))
+        except (OSError, ValueError):
+            return None
+
+    def __write_commands_fingerprint(self, app_id: str, fingerprint: str):
+        if not self.commands_cache:
+            return
+        try:
+            with open(self.commands_cache, 'r', encoding='utf-8') as f:
+                fingerprints = json.load(f)
+        except (OSError, ValueError):
+            fingerprints = {}
+        fingerprints[str(app_id)] = fingerprint
+        with open(self.commands_cache, 'w', encoding='utf-8') as f:
+            json.dump(fingerprints, f)
+
+    async def __interaction_create(self, data: GatewayOutput):
+        command_data = data.d['data']
         
-        async def interaction_create(data: GatewayOutput):
-            command_data = data.d['data']
+        command_type = command_data['type']
+        command_name = command_data['name']
+        command_options = command_data.get('options')
+
+        selected_command = None
+        for i in self.commands[command_type]:
+            if i.name == command_name:
+                selected_command = i
+
+        interaction = Interaction(data.d, self.token)
+
+        if command_options:
+            options = {}
+            for i in command_options:
+                options[i['name']] = i['value']
             
-            command_type = command_data['type']
-            command_name = command_data['name']
-            command_options = command_data.get('options')
-
-            selected_command = None
-            for i in self.commands[command_type]:
-                if i.name == command_name:
-                    selected_command = i
-
-            interaction = Interaction(data.d, self.token)
-
-            if command_options:
-                options = {}
-                for i in command_options:
-                    options[i['name']] = i['value']
-                
-                await self.commands[command_type][selected_command](interaction, **options)
-            else:
-                await self.commands[command_type][selected_command](interaction)
+            await self.commands[command_type][selected_command](interaction, **options)
+        else:
+            await self.commands[command_type][selected_command](interaction)
+
+    def make_streams(self):
+        if self.shard_count is None:
+            self.streams = {0: self.__make_stream(None)}
+            return
+        ids = self.shard_ids if self.shard_ids is not None else range(self.shard_count)
+        self.streams = {i: self.__make_stream((i, self.shard_count)) for i in ids}
+
+    def __make_stream(self, shard: tuple[int, int] | None) -> DataStream:
+        return DataStream(
+            self.listener, self.headers, self.token, self.debug,
+            shard=shard, identify_limiter=self.identify_limiter, latencies=self.latencies, tracer=self.tracer,
+            **self.__stream_options
+        )
 
-        self.add_event('INTERACTION_CREATE', interaction_create)
+    @property
+    def stream(self) -> DataStream | None:
+        """
+        The first connection (the only one without sharding).
+        """
+        return next(iter(self.streams.values()), None)
+
+    def get_shard(self, guild_id: int) -> DataStream | None:
+        """
+        Get the connection of the shard that receives events of the guild.
+        Returns `None` if the shard isn't run by this process.
+        """
+        if self.shard_count is None or self.shard_count == 'auto':
+            return self.stream
+        return self.streams.get((int(guild_id) >> 22) % self.shard_count)
+
+    @property
+    def send_queue_size(self) -> int:
+        return sum(i.send_queue_size for i in self.streams.values())
+
+    def request_members(
+            self,
+            guild_id: int,
+            *,
+            query: str = '',
+            limit: int = 0,
+            user_ids: list[int] = None,
+            presences: bool = False,
+            cache: bool = True,
+            timeout: float = 30.0
+        ) -> 'AsyncIterator[GuildMembersChunk]':
+        """
+        Request members of the guild over the gateway and iterate over the
+        chunks (of up to 1000 members) they arrive in. Members are found by
+        the prefix of their username (`query`, an empty query with `limit=0`
+        gets all members and needs the `GUILD_MEMBERS` intent) or by
+        `user_ids`. With `cache=True` members are stored in the state.
+
+        The request is sent through the send queue of the guild's shard, so
+        it is rate limited like other gateway commands.
+        """
+        if (stream := self.get_shard(guild_id)) is None:
+            raise ValueError(f'Shard of guild {guild_id} is not run by this process')
+        return self.chunker.request(
+            stream, guild_id,
+            query=query, limit=limit, user_ids=user_ids, presences=presences, cache=cache, timeout=timeout
+        )
+
+    async def fetch_members_chunked(self, guild_id: int, **kwargs) -> 'list[GuildMember]':
+        """
+        Get all members of `request_members` as one list.
+        """
+        return [member async for chunk in self.request_members(guild_id, **kwargs) for member in chunk.members]
+
+    @property
+    def latency(self) -> float:
+        latencies = [i.latency for i in self.streams.values() if i.latency != float('inf')]
+        return sum(latencies) / len(latencies) if latencies else float('inf')
+
+    async def fetch_gateway_bot(self) -> dict[str, Any]:
+        """
+        Get the recommended shard count and the session start limit.
+        """
+        return await aget('/gateway/bot', self.token)
 
     async def run(self, intents: int = 0):
-        await self.stream.run(intents)
+        """
+        Run all shards. With `shards='auto'` the recommended shard count
+        is fetched from `/gateway/bot`. Shards identify in the order allowed
+        by `max_concurrency` of the session start limit.
+        """
+        try:
+            if self.shard_count is not None:
+                gateway = await self.fetch_gateway_bot()
+                self.identify_limiter.max_concurrency = gateway['session_start_limit']['max_concurrency']
+                if self.shard_count == 'auto':
+                    self.shard_count = gateway['shards']
+                    self.make_streams()
+
+            tasks = [create_task(i.run(intents)) for i in self.streams.values()]
+            done, pending = await wait(tasks, return_when=FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+        finally:
+            await self.close()
+
+    async def close(self):
+        for stream in self.streams.values():
+            await stream.close()
+        await self.dispatcher.close()
+        await self.http.close()
+        self.tracer.close()
     
     # API methods
     
-    def get_guild(self, id: int) -> 'Guild':
+    def get_guild(self, id: int, *, fresh: bool = False) -> 'Guild':
         from .guild import Guild
 
-        data = rget(f'/guilds/{id}', self.token).json()
+        if fresh or (data := self.state.get_guild(id)) is None:
+            data = cached_rget(f'/guilds/{id}', self.token, 'guild', fresh)
         return Guild(data, self.token) 
     
     def get_current_user_guilds(self) -> 'list[Guild]':
-        data = rget('/users/@me/guilds', self.token).json()
-
+        """
+        Blocking version of `fetch_current_user_guilds`: guilds missing from
+        the state are fetched one by one, waiting for the rate limits. Don't
+        use it inside the event loop, `iter_current_user_guilds` fetches them
+        concurrently.
+        """
         result = []
-        for partial_guild in data:
-            result.append(self.get_guild(partial_guild['id']))
-        return result
+        after = None
+        while True:
+            params = {'limit': 200}
+            if after:
+                params['after'] = after
+            data = rget('/users/@me/guilds', self.token, params=params).json()
+            result += [self.get_guild(i['id']) for i in data]
+            if len(data) < 200:
+                return result
+            after = data[-1]['id']
 
-    def get_channel(self, id: int) -> 'GuildChannel':
+    def get_channel(self, id: int, *, fresh: bool = False) -> 'GuildChannel':
         from .guild import GuildChannel
 
-        data = rget(f'/channels/{id}', self.token).json()
+        if fresh or (data := self.state.get_channel(id)) is None:
+            data = cached_rget(f'/channels/{id}', self.token, 'channel', fresh)
         return GuildChannel(data, self.token)
     
-    def get_user(self, id: int) -> 'User':
+    def get_user(self, id: int, *, fresh: bool = False) -> 'User':
         from .user import User
 
-        data = rget(f'/users/{id}', self.token).json()
+        data = cached_rget(f'/users/{id}', self.token, 'user', fresh)
         return User(data, self.token)
     
-    def get_current_user(self) -> 'User':
+    def get_current_user(self, *, fresh: bool = False) -> 'User':
+        from .user import User
+
+        data = cached_rget('/users/@me', self.token, 'user', fresh)
+        return User(data, self.token)
+
+    async def fetch_guild(self, id: int, *, fresh: bool = False) -> 'Guild':
+        from .guild import Guild
+
+        if fresh or (data := self.state.get_guild(id)) is None:
+            data = await aget(f'/guilds/{id}', self.token, cache='guild', fresh=fresh)
+        return Guild(data, self.token)
+
+    async def iter_current_user_guilds(self, *, partial: bool = False, concurrency: int = 10) -> 'AsyncIterator[Guild]':
+        """
+        Iterate over guilds of the bot. Full guilds are fetched concurrently
+        (at most `concurrency` requests at once) and are yielded in the order
+        they arrive. With `partial=True` the partial guilds from
+        `/users/@me/guilds` are yielded without any extra requests.
+        """
+        from .guild import Guild
+
+        semaphore = Semaphore(concurrency)
+
+        async def fetch(id: int) -> 'Guild':
+            async with semaphore:
+                return await self.fetch_guild(id)
+
+        after = None
+        while True:
+            params = {'limit': 200}
+            if after:
+                params['after'] = after
+            data = await aget('/users/@me/guilds', self.token, params=params)
+            if not data:
+                return
+
+            if partial:
+                for partial_guild in data:
+                    yield Guild(partial_guild, self.token)
+            else:
+                tasks = [create_task(fetch(i['id'])) for i in data]
+                try:
+                    for task in as_completed(tasks):
+                        yield await task
+                finally:
+                    for task in tasks:
+                        task.cancel()
+
+            if len(data) < 200:
+                return
+            after = data[-1]['id']
+
+    async def fetch_current_user_guilds(self, *, partial: bool = False, concurrency: int = 10) -> 'list[Guild]':
+        return [i async for i in self.iter_current_user_guilds(partial=partial, concurrency=concurrency)]
+
+    async def fetch_channel(self, id: int, *, fresh: bool = False) -> 'GuildChannel':
+        from .guild import GuildChannel
+
+        if fresh or (data := self.state.get_channel(id)) is None:
+            data = await aget(f'/channels/{id}', self.token, cache='channel', fresh=fresh)
+        return GuildChannel(data, self.token)
+
+    async def fetch_user(self, id: int, *, fresh: bool = False) -> 'User':
+        from .user import User
+
+        data = await aget(f'/users/{id}', self.token, cache='user', fresh=fresh)
+        return User(data, self.token)
+
+    async def fetch_current_user(self, *, fresh: bool = False) -> 'User':
         from .user import User
 
-        data = rget('/users/@me', self.token).json()
+        data = await aget('/users/@me', self.token, cache='user', fresh=fresh)
         return User(data, self.token)